@@ -0,0 +1,224 @@
+import re
+import typing as t
+from pathlib import Path, PurePosixPath
+
+from buildio import copy_if_changed, write_if_changed
+from linkindex import fingerprinted_url, resolve_link
+
+FINGERPRINT_LENGTH = 10
+
+# HTML documents keep their names, but their links to fingerprinted
+# assets are rewritten.
+HTML_SUFFIXES = frozenset({".html", ".htm"})
+
+# Assets referenced from pages and layouts; other files, such as
+# robots.txt or HTML pages, keep their names.
+FINGERPRINTED_SUFFIXES = frozenset(
+    {
+        ".css",
+        ".js",
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".svg",
+        ".webp",
+        ".ico",
+        ".woff",
+        ".woff2",
+    }
+)
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_STRING = re.compile(r"\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*'")
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+# A space before a colon is a descendant combinator in a selector such
+# as ".nav :hover", so it is only dropped in declarations, where the
+# colon is followed by a value ending in ; or }.
+_CSS_DECLARATION_COLON = re.compile(r"\s*:\s*(?=[^{};]*[;}])")
+_CSS_COLON_SPACE = re.compile(r":\s+")
+_HTML_COMMENT = re.compile(r"<!--(?!\[).*?-->", re.DOTALL)
+_HTML_RAW = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)", re.DOTALL | re.I
+)
+_HTML_SPACE = re.compile(r"\s+")
+_URL_ATTRIBUTE = re.compile(r"""(\b(?:href|src)=)(["'])([^"']*)\2""")
+_CSS_URL = re.compile(
+    r"""(url\(\s*)(["']?)([^"')\s]+)\2(\s*\))""", re.I
+)
+
+
+def fingerprint_name(name: str, digest: str) -> str:
+    """
+    Inserts a content hash into an asset path, before its suffix.
+
+    :param name: The relative path, e.g. "css/site.css".
+    :param digest: The hex digest of the contents.
+    :return: The fingerprinted path, e.g. "css/site.0123456789.css".
+    """
+    path = PurePosixPath(name)
+    digest = digest[:FINGERPRINT_LENGTH]
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+
+def should_fingerprint(name: str) -> bool:
+    """
+    Tells whether an asset is renamed after its content hash.
+    """
+    return PurePosixPath(name).suffix.lower() in FINGERPRINTED_SUFFIXES
+
+
+def minify_css(css: str) -> str:
+    """
+    Removes comments and insignificant whitespace from a stylesheet.
+
+    Strings are kept as they are.
+
+    :param css: The stylesheet.
+    :return: The minified stylesheet.
+    """
+    parts = []
+    position = 0
+    for match in _CSS_STRING.finditer(css):
+        parts.append(_minify_css_code(css[position : match.start()]))
+        parts.append(match.group())
+        position = match.end()
+    parts.append(_minify_css_code(css[position:]))
+    return "".join(parts).strip()
+
+
+def _minify_css_code(code: str) -> str:
+    """
+    Minifies a stretch of CSS that holds no strings.
+    """
+    code = _CSS_COMMENT.sub("", code)
+    code = _CSS_SPACE.sub(" ", code)
+    code = _CSS_PUNCTUATION.sub(r"\1", code)
+    code = _CSS_DECLARATION_COLON.sub(":", code)
+    code = _CSS_COLON_SPACE.sub(":", code)
+    return code.replace(";}", "}")
+
+
+def minify_html(html: str) -> str:
+    """
+    Removes comments and collapses whitespace in an HTML document.
+
+    Runs of whitespace, including between tags, become one space, since
+    whitespace between inline elements is rendered. The contents of
+    pre, textarea, script and style elements, and conditional comments,
+    are kept as they are.
+
+    :param html: The document.
+    :return: The minified document.
+    """
+    parts = _HTML_RAW.split(html)
+    minified = []
+    for index in range(0, len(parts), 3):
+        text = _HTML_COMMENT.sub("", parts[index])
+        minified.append(_HTML_SPACE.sub(" ", text))
+        if index + 1 < len(parts):
+            minified.append(parts[index + 1])
+    return "".join(minified).strip()
+
+
+def rewrite_asset_urls(html: str, assets: dict[str, str]) -> str:
+    """
+    Points the href and src attributes of a layout or HTML asset at
+    fingerprinted assets. Only site-absolute URLs are rewritten, since
+    relative ones depend on the page the layout is used for.
+
+    :param html: The layout or document source.
+    :param assets: A mapping from asset URL to fingerprinted URL.
+    :return: The rewritten source.
+    """
+
+    def replace(match: re.Match[str]) -> str:
+        url = fingerprinted_url(match[3], assets)
+        return f"{match[1]}{match[2]}{url}{match[2]}"
+
+    return _URL_ATTRIBUTE.sub(replace, html)
+
+
+def rewrite_css_urls(css: str, url: str, assets: dict[str, str]) -> str:
+    """
+    Points the url() references of a stylesheet at fingerprinted
+    assets. Relative references are resolved against the stylesheet
+    and stay relative: only their file name changes, as fingerprinting
+    keeps assets in their directory.
+
+    :param css: The stylesheet.
+    :param url: The site-absolute URL of the stylesheet.
+    :param assets: A mapping from asset URL to fingerprinted URL.
+    :return: The rewritten stylesheet.
+    """
+
+    def replace(match: re.Match[str]) -> str:
+        reference = match[3]
+        resolved = resolve_link(url, reference)
+        if resolved is None or reference.startswith("#"):
+            return match[0]
+        fingerprinted = fingerprinted_url(resolved, assets)
+        if fingerprinted == resolved:
+            return match[0]
+        if not reference.startswith("/"):
+            end = len(reference)
+            for separator in "?#":
+                position = reference.find(separator)
+                if position != -1:
+                    end = min(end, position)
+            directory = reference[: reference.rfind("/", 0, end) + 1]
+            name = fingerprinted[fingerprinted.rfind("/") + 1 :]
+            fingerprinted = directory + name
+        return (
+            f"{match[1]}{match[2]}{fingerprinted}{match[2]}{match[4]}"
+        )
+
+    return _CSS_URL.sub(replace, css)
+
+
+MINIFIERS: dict[str, t.Callable[[str], str]] = {
+    ".css": minify_css,
+    ".html": minify_html,
+    ".htm": minify_html,
+}
+
+
+def process_asset(
+    source: Path,
+    output: Path,
+    minify: bool = False,
+    url: t.Optional[str] = None,
+    assets: t.Optional[dict[str, str]] = None,
+) -> bool:
+    """
+    Writes an asset to the output directory, rewriting the url()
+    references of stylesheets and the href and src attributes of HTML
+    documents to fingerprinted assets, and minifying stylesheets and
+    HTML documents when asked to. Runs in worker processes.
+
+    :param source: The asset file.
+    :param output: The destination file.
+    :param minify: Whether to minify assets that have a minifier.
+    :param url: The site-absolute URL of the asset, needed to resolve
+        the references of a stylesheet.
+    :param assets: An optional mapping from asset URL to fingerprinted
+        URL.
+    :return: True if the output was written, False if it was unchanged.
+    """
+    suffix = source.suffix.lower()
+    minifier = MINIFIERS.get(suffix) if minify else None
+    rewrite = bool(assets) and (
+        suffix in HTML_SUFFIXES or suffix == ".css" and url is not None
+    )
+    if minifier is None and not rewrite:
+        return copy_if_changed(source, output)
+    text = source.read_text(encoding="utf-8")
+    if rewrite and assets:
+        if suffix in HTML_SUFFIXES:
+            text = rewrite_asset_urls(text, assets)
+        elif url is not None:
+            text = rewrite_css_urls(text, url, assets)
+    if minifier is not None:
+        text = minifier(text)
+    return write_if_changed(output, text.encode("utf-8"))
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import typing as t
+from pathlib import Path
+
+from blocks import PARSER_VERSION
+from flatdoc import FORMAT_VERSION, FlatDocument
+from htmlnode import INLINE_FACTORIES
+from utils import registered_delimiters
+
+
+def cache_key(source_hash: str, heading_ids: bool) -> str:
+    """
+    Returns the cache key of a parsed source.
+
+    The key covers the parser and format versions and the inline
+    delimiters and factories registered at runtime, so documents cached
+    by an older parser or with other extensions are never reused.
+
+    :param source_hash: The content hash of the Markdown source.
+    :param heading_ids: Whether headings were parsed with anchor ids.
+    :return: The key, usable as a file name.
+    """
+    variant = "ids" if heading_ids else "plain"
+    return (
+        f"p{PARSER_VERSION}f{FORMAT_VERSION}x{inline_fingerprint()}"
+        f"-{variant}-{source_hash}"
+    )
+
+
+def inline_fingerprint() -> str:
+    """
+    Returns a short hash of the registered inline delimiters and
+    factories.
+
+    Factories are described by their qualified name and the values they
+    close over, as for the factories of htmlnode.leaf_factory(). Other
+    callables may describe themselves differently in every process,
+    which only makes the cache miss.
+    """
+    factories = sorted(
+        (repr(text_type), _describe(factory))
+        for text_type, factory in INLINE_FACTORIES.items()
+    )
+    description = repr((registered_delimiters(), factories))
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()[:10]
+
+
+def _describe(factory: t.Callable[..., object]) -> str:
+    name = getattr(factory, "__qualname__", None)
+    if name is None:
+        return repr(factory)
+    cells = getattr(factory, "__closure__", None) or ()
+    values = tuple(cell.cell_contents for cell in cells)
+    return f"{factory.__module__}.{name}{values!r}"
+
+
+class ASTCache:
+    """
+    An on-disk cache of parsed documents, keyed by source hash.
+
+    Each document is stored in its own file in the binary format of
+    FlatDocument.to_bytes(), so the cache directory can be shared
+    between worker processes and restored from a CI artifact. Files
+    that cannot be loaded are treated as misses.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Initializes an ASTCache, creating its directory if needed.
+
+        :param directory: The directory holding the cached documents.
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        """
+        Returns the file a document is cached in.
+        """
+        return self.directory / f"{key}.ast"
+
+    def get(self, key: str) -> t.Optional[FlatDocument]:
+        """
+        Loads a cached document.
+
+        :param key: The key returned by cache_key().
+        :return: The document, or None if it is missing, unreadable or
+            corrupt.
+        """
+        try:
+            document = FlatDocument.from_bytes(
+                self.path(key).read_bytes()
+            )
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return document
+
+    def put(self, key: str, document: FlatDocument) -> bool:
+        """
+        Stores a document atomically.
+
+        :param key: The key returned by cache_key().
+        :param document: The parsed document.
+        :return: False if the document holds attribute values that
+            cannot be serialized, in which case it is not cached.
+        """
+        try:
+            data = document.to_bytes()
+        except TypeError:
+            return False
+        path = self.path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
+        return True
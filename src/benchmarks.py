@@ -0,0 +1,514 @@
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing as t
+from pathlib import Path
+
+from astcache import ASTCache
+from build import build_site, render_page
+from flatdoc import FlatDocument
+from htmlnode import (
+    HTMLNode,
+    LeafNode,
+    ParentNode,
+    text_node_to_html_node,
+    text_nodes_to_html_nodes,
+)
+from textnode import TextNode, TextType
+from utils import split_nodes_delimiter, text_to_textnodes
+
+SRC_DIR = Path(__file__).resolve().parent
+
+SAMPLE_TEXT = (
+    "This is **bold** text with an _italic_ word, a `code span`, a "
+    "[link](https://example.com/page) and an "
+    "![image](https://example.com/image.png) in one paragraph."
+)
+
+SAMPLE_PAGE = """# Page {index}
+
+{paragraph}
+
+## Section
+
+- first {paragraph}
+- second item
+
+1. ordered
+2. list
+
+> A quote with `code` in it.
+
+```
+code block
+```
+"""
+
+
+class Result:
+    """
+    The measurement of one benchmark case.
+    """
+
+    def __init__(
+        self, name: str, items: int, unit: str, value: float
+    ) -> None:
+        """
+        Initializes a Result.
+
+        :param name: The name of the benchmark case.
+        :param items: The number of items processed per run.
+        :param unit: The unit of value, either "s" or "bytes/node".
+        :param value: The best wall time or the memory per node.
+        """
+        self.name = name
+        self.items = items
+        self.unit = unit
+        self.value = value
+
+    def to_dict(self) -> dict[str, t.Any]:
+        return {
+            "items": self.items,
+            "unit": self.unit,
+            "value": self.value,
+        }
+
+    def __str__(self) -> str:
+        if self.unit == "s":
+            return (
+                f"{self.name:<32} {self.items:>10} items "
+                f"{self.value * 1000:>10.1f} ms "
+                f"{self.items / self.value:>14,.0f} items/s"
+            )
+        return f"{self.name:<32} {self.value:>10.1f} {self.unit}"
+
+
+def build_deep_tree(depth: int) -> HTMLNode:
+    """
+    Builds a chain of nested ParentNodes ending in a single leaf.
+
+    :param depth: The number of nested ParentNodes.
+    :return: The root of the tree.
+    """
+    node: HTMLNode = LeafNode("b", "leaf")
+    for _ in range(depth):
+        node = ParentNode("div", [node])
+    return node
+
+
+def build_wide_tree(nodes: int, fanout: int = 1000) -> HTMLNode:
+    """
+    Builds a two-level tree with roughly the requested number of nodes.
+
+    :param nodes: The approximate total number of nodes.
+    :param fanout: The number of leaves under each section.
+    :return: The root of the tree.
+    """
+    sections = max(1, nodes // (fanout + 1))
+    return ParentNode(
+        "main",
+        [
+            ParentNode(
+                "section",
+                [LeafNode("p", f"item {i}") for i in range(fanout)],
+            )
+            for _ in range(sections)
+        ],
+    )
+
+
+def build_flat(leaves: int, text: str) -> FlatDocument:
+    """
+    Builds a FlatDocument holding one element with the given number of
+    leaves.
+
+    :param leaves: The number of leaves.
+    :param text: The value of every leaf.
+    :return: The document.
+    """
+    document = FlatDocument()
+    document.open("div")
+    for _ in range(leaves):
+        document.add_leaf("p", text)
+    document.close()
+    # Reading the text joins the value chunks into the buffer, which is
+    # otherwise done lazily by the first render being timed.
+    document.text
+    return document
+
+
+def measure(func: t.Callable[[], object], repeat: int) -> float:
+    """
+    Runs a function several times and returns the best wall time.
+
+    :param func: The function to time.
+    :param repeat: The number of runs.
+    :return: The fastest run, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def memory_per_node(
+    build: t.Callable[[int], list[object]], count: int
+) -> float:
+    """
+    Measures the average memory allocated per node built.
+
+    :param build: A function building the given number of nodes.
+    :param count: The number of nodes to build.
+    :return: The number of bytes allocated per node.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = build(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nodes
+    return (after - before) / count
+
+
+def run_inline(scale: int, repeat: int) -> t.Iterator[Result]:
+    """
+    Benchmarks inline parsing and conversion to leaves.
+    """
+    count = 1000 * scale
+    nodes = [TextNode(SAMPLE_TEXT, TextType.TEXT) for _ in range(count)]
+    yield Result(
+        "split_nodes_delimiter",
+        count,
+        "s",
+        measure(
+            lambda: split_nodes_delimiter(nodes, "`", TextType.CODE),
+            repeat,
+        ),
+    )
+    yield Result(
+        "text_to_textnodes",
+        count,
+        "s",
+        measure(
+            lambda: [
+                text_to_textnodes(SAMPLE_TEXT) for _ in range(count)
+            ],
+            repeat,
+        ),
+    )
+    text_nodes = text_to_textnodes(SAMPLE_TEXT) * count
+    yield Result(
+        "text_node_to_html_node",
+        len(text_nodes),
+        "s",
+        measure(
+            lambda: [
+                text_node_to_html_node(node) for node in text_nodes
+            ],
+            repeat,
+        ),
+    )
+    yield Result(
+        "text_nodes_to_html_nodes",
+        len(text_nodes),
+        "s",
+        measure(lambda: text_nodes_to_html_nodes(text_nodes), repeat),
+    )
+
+
+def run_render(
+    scale: int, depth: int, repeat: int
+) -> t.Iterator[Result]:
+    """
+    Benchmarks rendering of leaves, wide trees and deep trees.
+    """
+    leaves = [
+        LeafNode("a", "link text", {"href": "https://example.com"})
+        for _ in range(10_000 * scale)
+    ]
+    yield Result(
+        "LeafNode.to_html",
+        len(leaves),
+        "s",
+        measure(lambda: [leaf.to_html() for leaf in leaves], repeat),
+    )
+    nodes = 100_000 * scale
+    wide = build_wide_tree(nodes)
+    yield Result(
+        "ParentNode.to_html wide",
+        nodes,
+        "s",
+        measure(wide.to_html, repeat),
+    )
+    flat = FlatDocument.from_node(wide)
+    del wide
+    yield Result(
+        "FlatDocument.to_html wide",
+        nodes,
+        "s",
+        measure(flat.to_html, repeat),
+    )
+    del flat
+    deep = build_deep_tree(depth)
+    deep_copy = build_deep_tree(depth)
+    yield Result(
+        "ParentNode.to_html deep",
+        depth + 1,
+        "s",
+        measure(deep.to_html, repeat),
+    )
+    yield Result(
+        "HTMLNode.__eq__ deep",
+        depth + 1,
+        "s",
+        measure(lambda: deep == deep_copy, repeat),
+    )
+
+
+def run_build(scale: int, repeat: int) -> t.Iterator[Result]:
+    """
+    Benchmarks rendering single pages and building a whole site.
+    """
+    pages = 50 * scale
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        content = root / "content"
+        content.mkdir()
+        paragraph = " ".join([SAMPLE_TEXT] * 20)
+        for index in range(pages):
+            (content / f"page{index}.md").write_text(
+                SAMPLE_PAGE.format(index=index, paragraph=paragraph)
+                * 10
+            )
+        sources = sorted(content.iterdir())
+        yield Result(
+            "render_page",
+            pages,
+            "s",
+            measure(
+                lambda: [render_page(source) for source in sources],
+                repeat,
+            ),
+        )
+        cache = ASTCache(root / "cache")
+        for source in sources:
+            render_page(source, cache=cache)
+        yield Result(
+            "render_page cached",
+            pages,
+            "s",
+            measure(
+                lambda: [
+                    render_page(source, cache=cache)
+                    for source in sources
+                ],
+                repeat,
+            ),
+        )
+        yield Result(
+            "build_site",
+            pages,
+            "s",
+            measure(
+                lambda: build_site(content, root / "public"), repeat
+            ),
+        )
+        yield Result(
+            "build_site incremental no-op",
+            pages,
+            "s",
+            measure(
+                lambda: build_site(
+                    content, root / "public", incremental=True
+                ),
+                repeat,
+            ),
+        )
+
+
+def import_time(module: str) -> float:
+    """
+    Imports a module in a fresh interpreter and returns its cumulative
+    import time, as reported by python -X importtime.
+
+    :param module: The name of the module, importable from src/.
+    :return: The import time, in seconds.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(completed.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1_000_000
+    raise ValueError(f"no import time reported for {module}")
+
+
+def run_startup(repeat: int) -> t.Iterator[Result]:
+    """
+    Benchmarks starting the CLI: the import time of its entry point and
+    of the build module, and a whole single-page rebuild.
+    """
+    for module in ("main", "build"):
+        yield Result(
+            f"import {module}",
+            1,
+            "s",
+            min(import_time(module) for _ in range(repeat)),
+        )
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        content = root / "content"
+        content.mkdir()
+        source = content / "index.md"
+        paragraph = " ".join([SAMPLE_TEXT] * 20)
+        source.write_text(
+            SAMPLE_PAGE.format(index=0, paragraph=paragraph)
+        )
+        command = [
+            sys.executable,
+            str(SRC_DIR / "main.py"),
+            "page",
+            "--content",
+            str(content),
+            "--output",
+            str(root / "public"),
+            str(source),
+        ]
+        yield Result(
+            "main.py page",
+            1,
+            "s",
+            measure(
+                lambda: subprocess.run(
+                    command, capture_output=True, check=True
+                ),
+                repeat,
+            ),
+        )
+
+
+def run_memory(count: int) -> t.Iterator[Result]:
+    """
+    Measures the memory used per node of each node class.
+    """
+    text = "shared text"
+    builders: list[tuple[str, t.Callable[[int], list[t.Any]]]] = [
+        (
+            "TextNode",
+            lambda n: [TextNode(text, TextType.TEXT) for _ in range(n)],
+        ),
+        ("LeafNode", lambda n: [LeafNode("p", text) for _ in range(n)]),
+        (
+            "ParentNode",
+            lambda n: [ParentNode("div", []) for _ in range(n)],
+        ),
+    ]
+    builders.append(("FlatDocument", lambda n: [build_flat(n, text)]))
+    for name, build in builders:
+        yield Result(
+            f"{name} memory",
+            count,
+            "bytes/node",
+            memory_per_node(build, count),
+        )
+
+
+def compare(
+    results: list[Result],
+    baseline: dict[str, dict[str, t.Any]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Compares results against a stored baseline.
+
+    :param results: The current results.
+    :param baseline: The baseline, as written by --json.
+    :param tolerance: The allowed relative slowdown, e.g. 0.25.
+    :return: A message for each case worse than the tolerance allows.
+    """
+    regressions = []
+    for result in results:
+        recorded = baseline.get(result.name)
+        if recorded is None or recorded["unit"] != result.unit:
+            continue
+        before = recorded["value"] / recorded["items"]
+        after = result.value / result.items
+        if result.unit != "s":
+            before, after = recorded["value"], result.value
+        if after > before * (1 + tolerance):
+            regressions.append(
+                f"{result.name}: {after / before:.2f}x the baseline"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the parse and render pipeline."
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="multiplies the size of every synthetic corpus",
+    )
+    parser.add_argument("--depth", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--memory-nodes", type=int, default=100_000)
+    parser.add_argument(
+        "--json", type=Path, help="write the results to this file"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="compare against results previously written by --json",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative slowdown before a case is flagged",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for result in (
+        *run_inline(args.scale, args.repeat),
+        *run_render(args.scale, args.depth, args.repeat),
+        *run_build(args.scale, args.repeat),
+        *run_startup(args.repeat),
+        *run_memory(args.memory_nodes),
+    ):
+        print(result)
+        results.append(result)
+
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(
+                {result.name: result.to_dict() for result in results},
+                fp,
+                indent=2,
+            )
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import re
+import typing as t
+from enum import Enum
+
+from htmlnode import (
+    HTMLNode,
+    LeafNode,
+    ParentNode,
+    text_nodes_to_html_nodes,
+)
+from linkindex import slugify
+from utils import text_to_textnodes
+
+
+class BlockType(Enum):
+    PARAGRAPH = "paragraph"
+    HEADING = "heading"
+    CODE = "code"
+    QUOTE = "quote"
+    UNORDERED_LIST = "unordered_list"
+    ORDERED_LIST = "ordered_list"
+
+
+# Bump whenever the parser's output changes, so documents cached by an
+# older parser are not reused.
+PARSER_VERSION = 2
+
+_HEADING_PATTERN = re.compile(r"(#{1,6}) (.*)")
+_UNORDERED_ITEM_PATTERN = re.compile(r"[-*] (.*)")
+_ORDERED_ITEM_PATTERN = re.compile(r"\d+\. (.*)")
+_CODE_FENCE = "```"
+
+
+def text_to_children(text: str) -> list[HTMLNode]:
+    """
+    Converts inline Markdown to the HTMLNodes of a block's children.
+
+    :param text: The inline Markdown source.
+    :return: The list of child nodes, never empty.
+    """
+    children = text_nodes_to_html_nodes(text_to_textnodes(text))
+    return children or [LeafNode.trusted(None, "")]
+
+
+def _build_block(block_type: BlockType, lines: list[str]) -> ParentNode:
+    """
+    Builds the ParentNode of a finished paragraph, quote or list block.
+    """
+    match (block_type):
+        case BlockType.PARAGRAPH:
+            return ParentNode.trusted(
+                "p", text_to_children(" ".join(lines))
+            )
+        case BlockType.QUOTE:
+            return ParentNode.trusted(
+                "blockquote", text_to_children(" ".join(lines))
+            )
+        case BlockType.UNORDERED_LIST:
+            tag = "ul"
+        case BlockType.ORDERED_LIST:
+            tag = "ol"
+        case _:
+            raise ValueError(f"Unsupported block type: {block_type}")
+    items: list[HTMLNode] = [
+        ParentNode.trusted("li", text_to_children(line))
+        for line in lines
+    ]
+    return ParentNode.trusted(tag, items)
+
+
+def _classify(line: str) -> tuple[BlockType, str]:
+    """
+    Returns the block type a line belongs to and its text without the
+    block markup.
+    """
+    first = line[:1]
+    if first == "#":
+        match = _HEADING_PATTERN.fullmatch(line)
+        if match:
+            return BlockType.HEADING, match[2].strip()
+    elif first == ">":
+        return BlockType.QUOTE, line[1:].strip()
+    elif first in ("-", "*"):
+        match = _UNORDERED_ITEM_PATTERN.fullmatch(line)
+        if match:
+            return BlockType.UNORDERED_LIST, match[1]
+    elif first.isdigit():
+        match = _ORDERED_ITEM_PATTERN.fullmatch(line)
+        if match:
+            return BlockType.ORDERED_LIST, match[1]
+    return BlockType.PARAGRAPH, line.strip()
+
+
+def _unique_id(children: list[HTMLNode], used_ids: set[str]) -> str:
+    """
+    Derives an id from a heading's text that is not in used_ids, and
+    adds it there.
+    """
+    base = slugify("".join(child.value or "" for child in children))
+    anchor = base
+    suffix = 1
+    while anchor in used_ids:
+        anchor = f"{base}-{suffix}"
+        suffix += 1
+    used_ids.add(anchor)
+    return anchor
+
+
+def iter_blocks(
+    lines: t.Iterable[str], heading_ids: bool = False
+) -> t.Iterator[ParentNode]:
+    """
+    Parses Markdown from a stream of lines, yielding one ParentNode per
+    block as soon as the block is complete.
+
+    Only the lines of the current block are held in memory, so input of
+    any size can be converted and serialized block by block. Supported
+    blocks are headings, paragraphs, fenced code, quotes and ordered and
+    unordered lists; blocks end at a blank line or when a line starts a
+    block of another type.
+
+    :param lines: The Markdown source, one line per item. Trailing
+        newlines are ignored, so an open text file can be passed.
+    :param heading_ids: Whether headings get an id attribute derived
+        from their text, unique within the document, to link to.
+    :return: An iterator over the block nodes, in document order.
+    """
+    block_type: t.Optional[BlockType] = None
+    pending: list[str] = []
+    code: t.Optional[list[str]] = None
+    used_ids: set[str] = set()
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if code is not None:
+            if line.strip() == _CODE_FENCE:
+                yield ParentNode.trusted(
+                    "pre",
+                    [LeafNode.trusted("code", "".join(code))],
+                )
+                code = None
+            else:
+                code.append(line + "\n")
+            continue
+        if not line.strip():
+            if block_type is not None:
+                yield _build_block(block_type, pending)
+                block_type, pending = None, []
+            continue
+        if line.strip().startswith(_CODE_FENCE):
+            if block_type is not None:
+                yield _build_block(block_type, pending)
+                block_type, pending = None, []
+            code = []
+            continue
+        line_type, text = _classify(line)
+        if line_type is BlockType.HEADING:
+            if block_type is not None:
+                yield _build_block(block_type, pending)
+                block_type, pending = None, []
+            level = len(line) - len(line.lstrip("#"))
+            children = text_to_children(text)
+            props: t.Optional[dict[str, str | int]] = None
+            if heading_ids:
+                props = {"id": _unique_id(children, used_ids)}
+            yield ParentNode.trusted(f"h{level}", children, props)
+            continue
+        if line_type is not block_type:
+            if block_type is not None:
+                yield _build_block(block_type, pending)
+            block_type, pending = line_type, []
+        pending.append(text)
+    if code is not None:
+        yield ParentNode.trusted(
+            "pre", [LeafNode.trusted("code", "".join(code))]
+        )
+    elif block_type is not None:
+        yield _build_block(block_type, pending)
+
+
+def markdown_to_html_node(markdown: str) -> ParentNode:
+    """
+    Converts a Markdown document to a tree of HTMLNodes.
+
+    :param markdown: The Markdown source.
+    :return: A div ParentNode holding one child per block.
+    """
+    children: list[HTMLNode] = list(iter_blocks(markdown.splitlines()))
+    if not children:
+        children.append(LeafNode.trusted(None, ""))
+    return ParentNode.trusted("div", children)
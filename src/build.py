@@ -0,0 +1,854 @@
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import typing as t
+from pathlib import Path, PurePosixPath
+
+from blocks import iter_blocks
+from buildio import (
+    BatchWriter,
+    iter_source_lines,
+    write_if_changed,
+)
+from escaping import escape_text
+from htmlnode import HTMLNode, walk
+from linkindex import LinkIndex, PageLinks
+from template import Template, load_template
+
+# The parse cache, the asset pipeline, listings and profiling are
+# imported where they are used, so rendering a single page does not
+# pay for the modules only whole builds need.
+if t.TYPE_CHECKING:
+    from astcache import ASTCache
+    from flatdoc import FlatDocument
+    from listing import ListingWriter, PageRecord, SearchIndexWriter
+    from profiling import Profiler
+
+MANIFEST_VERSION = 3
+
+# The manifest key recording the build options an output depends on.
+OPTIONS_KEY = "<options>"
+
+LISTING_DIR = "list"
+SEARCH_DIR = "search"
+
+# The recorded hash, size and mtime of an input file, or the hash of
+# the build options.
+DependencyState = dict[str, t.Any]
+
+PageResult = tuple[
+    PageLinks, t.Optional["PageRecord"], t.Optional[dict[str, t.Any]]
+]
+
+DEFAULT_TEMPLATE = Template.compile(
+    """<html>
+  <head>
+    <title>{{ title }}</title>
+  </head>
+  <body>
+{{ content }}
+  </body>
+</html>
+"""
+)
+
+
+class Manifest:
+    """
+    The on-disk record of what every output file was built from.
+
+    For each output, keyed by its path relative to the output directory,
+    the manifest stores the files it depends on with their content
+    hash, size and modification time. Size and mtime let unchanged
+    inputs be recognised without re-reading them. The options pages
+    were built with are kept too, so single pages can be rendered the
+    same way, and so are the anchors and links of every page, so pages
+    skipped by an incremental build still have their links checked.
+    """
+
+    def __init__(
+        self,
+        outputs: t.Optional[
+            dict[str, dict[str, DependencyState]]
+        ] = None,
+        options: t.Optional[dict[str, t.Any]] = None,
+        links: t.Optional[dict[str, dict[str, list[str]]]] = None,
+    ) -> None:
+        """
+        Initializes a Manifest.
+
+        :param outputs: A mapping from relative output path to its
+            dependencies, each a mapping from input path to its recorded
+            state.
+        :param options: The build options pages were rendered with: the
+            mapping from asset URL to fingerprinted URL, and whether the
+            layout was minified.
+        :param links: A mapping from page URL to the anchors and links
+            found on the page, as saved by PageLinks.to_dict().
+        """
+        self.outputs = outputs if outputs is not None else {}
+        self.options = options if options is not None else {}
+        self.links = links if links is not None else {}
+        self._states = {
+            key: state
+            for dependencies in self.outputs.values()
+            for key, state in dependencies.items()
+        }
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        """
+        Loads a manifest, returning an empty one if the file is missing,
+        unreadable or was written by another manifest version.
+
+        :param path: The path of the manifest file.
+        :return: The loaded Manifest.
+        """
+        try:
+            with open(path, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            return cls()
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != MANIFEST_VERSION
+        ):
+            return cls()
+        return cls(
+            data.get("outputs", {}),
+            data.get("options", {}),
+            data.get("links", {}),
+        )
+
+    def save(self, path: Path) -> None:
+        """
+        Writes the manifest to disk atomically.
+
+        :param path: The path of the manifest file.
+        """
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "outputs": self.outputs,
+                    "options": self.options,
+                    "links": self.links,
+                },
+                fp,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, path)
+
+    def dependency_state(self, path: Path) -> DependencyState:
+        """
+        Returns the current state of an input file, reusing the recorded
+        hash when its size and modification time are unchanged.
+
+        :param path: The input file.
+        :return: A mapping with the hash, size and mtime of the file.
+        """
+        stat = path.stat()
+        recorded = self._states.get(str(path))
+        if (
+            recorded is not None
+            and recorded["size"] == stat.st_size
+            and recorded["mtime"] == stat.st_mtime_ns
+        ):
+            return recorded
+        return {
+            "hash": file_hash(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+        }
+
+    def is_fresh(
+        self,
+        key: str,
+        output: Path,
+        dependencies: dict[str, DependencyState],
+    ) -> bool:
+        """
+        Checks whether an output exists and was built from exactly the
+        given dependencies.
+
+        :param key: The path of the output relative to the output
+            directory.
+        :param output: The output file.
+        :param dependencies: The current state of its inputs.
+        :return: True if the output does not need rebuilding.
+        """
+        recorded = self.outputs.get(key)
+        if recorded is None or not output.exists():
+            return False
+        return recorded.keys() == dependencies.keys() and all(
+            recorded[key]["hash"] == state["hash"]
+            for key, state in dependencies.items()
+        )
+
+
+class BuildResult:
+    """
+    The outcome of a site build.
+    """
+
+    def __init__(self) -> None:
+        self.built: list[Path] = []
+        self.skipped: list[Path] = []
+        self.removed: list[Path] = []
+        self.generated: list[Path] = []
+        self.dead_links: list[tuple[str, str]] = []
+
+
+def file_hash(path: Path) -> str:
+    """
+    Computes the SHA-256 hash of a file's contents.
+
+    :param path: The file to hash.
+    :return: The hex digest of the contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_page(
+    source: Path,
+    template: Template = DEFAULT_TEMPLATE,
+    profiler: t.Optional["Profiler"] = None,
+    links: t.Optional[PageLinks] = None,
+    cache: t.Optional["ASTCache"] = None,
+    record: t.Optional["PageRecord"] = None,
+) -> str:
+    """
+    Renders a Markdown source file to a complete HTML page.
+
+    The source is parsed line by line and each block is serialized as
+    soon as it is complete. The first level-one heading is used as the
+    page title, falling back to the file name.
+
+    :param source: The Markdown file.
+    :param template: The layout, filled through its title and content
+        slots.
+    :param profiler: An optional Profiler recording the parse, render
+        and template stages and the node and byte counts of the page.
+    :param links: An optional record of the page; when given, headings
+        get ids, and anchors and links are collected into it while
+        internal links are rewritten to their resolved URLs.
+    :param cache: An optional cache of parsed documents; a cached
+        document for the same source contents is rendered instead of
+        parsing the source, and newly parsed sources are cached.
+    :param record: An optional summary of the page for listings and
+        search, filled from the blocks as they are rendered.
+    :return: The HTML page.
+    """
+    page = str(source)
+    heading_ids = links is not None
+    document = None
+    if cache is not None:
+        from astcache import cache_key
+        from flatdoc import FlatDocument
+
+        key = cache_key(file_hash(source), heading_ids)
+        if profiler is None:
+            document = cache.get(key)
+        else:
+            with profiler.stage("cache_load", page):
+                document = cache.get(key)
+            profiler.count(
+                (
+                    "cache_hits"
+                    if document is not None
+                    else "cache_misses"
+                ),
+                page=page,
+            )
+    if document is not None:
+        title, content = _render_document(
+            document, profiler, links, page, record
+        )
+    else:
+        parsed = FlatDocument() if cache is not None else None
+        title, content = _render_source(
+            source, profiler, links, page, parsed, record
+        )
+        if cache is not None and parsed is not None:
+            cache.put(key, parsed)
+    if profiler is None:
+        return template.render(
+            title=escape_text(title or source.stem), content=content
+        )
+    with profiler.stage("template", page):
+        html = template.render(
+            title=escape_text(title or source.stem), content=content
+        )
+    profiler.count("bytes_rendered", len(html), page)
+    return html
+
+
+def _render_source(
+    source: Path,
+    profiler: t.Optional["Profiler"],
+    links: t.Optional[PageLinks],
+    page: str,
+    parsed: t.Optional["FlatDocument"] = None,
+    record: t.Optional["PageRecord"] = None,
+) -> tuple[t.Optional[str], str]:
+    """
+    Parses and renders a Markdown source block by block, copying the
+    blocks into parsed, before links are rewritten, when it is given.
+
+    :return: The page title, if any, and the rendered body.
+    """
+    title = None
+    fragments = ["<div>"]
+    blocks: t.Iterable[HTMLNode] = iter_blocks(
+        iter_source_lines(source), heading_ids=links is not None
+    )
+    if profiler is not None:
+        blocks = profiler.timed_iter("parse", blocks, page)
+    if parsed is not None:
+        parsed.open("div")
+    for block in blocks:
+        if title is None and block.tag == "h1":
+            title = "".join(
+                child.value or "" for child in block.children or ()
+            )
+        if parsed is not None:
+            parsed.add_node(block)
+        if record is not None:
+            record.collect(block)
+        if links is not None:
+            links.collect(block)
+        if profiler is None:
+            fragments.extend(block.iter_html())
+            continue
+        with profiler.stage("render", page):
+            fragments.extend(block.iter_html())
+        profiler.count(
+            "nodes", sum(entering for entering, _ in walk(block)), page
+        )
+    if parsed is not None:
+        parsed.close()
+    fragments.append("</div>")
+    return title, "".join(fragments)
+
+
+def _render_document(
+    document: "FlatDocument",
+    profiler: t.Optional["Profiler"],
+    links: t.Optional[PageLinks],
+    page: str,
+    record: t.Optional["PageRecord"] = None,
+) -> tuple[t.Optional[str], str]:
+    """
+    Renders a cached document, as _render_source() renders the source
+    it was parsed from.
+
+    :return: The page title, if any, and the rendered body.
+    """
+    title = None
+    for block in document.iter_children(0):
+        if document.tag_names[document.tags[block]] == "h1":
+            title = "".join(
+                document.value(child) or ""
+                for child in document.iter_children(block)
+            )
+            break
+    if record is not None:
+        record.collect_document(document)
+    if links is not None:
+        links.collect_document(document)
+    if len(document) == 1:
+        return title, "<div></div>"
+    if profiler is None:
+        return title, document.to_html()
+    with profiler.stage("render", page):
+        content = document.to_html()
+    profiler.count("nodes", len(document) - 1, page)
+    return title, content
+
+
+def build_site(
+    content_dir: Path,
+    output_dir: Path,
+    static_dir: t.Optional[Path] = None,
+    manifest_path: t.Optional[Path] = None,
+    incremental: bool = False,
+    jobs: int = 1,
+    template_path: t.Optional[Path] = None,
+    profiler: t.Optional["Profiler"] = None,
+    cache_dir: t.Optional[Path] = None,
+    fingerprint: bool = False,
+    minify: bool = False,
+    listing_page_size: t.Optional[int] = None,
+    search_index: bool = False,
+) -> BuildResult:
+    """
+    Builds every Markdown page and copies every static asset into the
+    output directory, recording their inputs in a manifest.
+
+    In incremental mode, outputs whose recorded inputs are unchanged are
+    skipped. Outputs recorded by a previous build that are no longer
+    produced are removed in both modes.
+
+    :param content_dir: The directory holding the Markdown sources.
+    :param output_dir: The directory the site is written to.
+    :param static_dir: An optional directory of assets to copy as-is.
+    :param manifest_path: Where the manifest is stored; defaults to
+        .<name>.manifest.json next to an output directory named <name>.
+    :param incremental: Whether to skip outputs that are up to date.
+    :param jobs: The number of worker processes rendering pages. Only
+        paths are sent to the workers, which write the pages themselves.
+    :param template_path: An optional layout file for every page; pages
+        are rebuilt when it changes.
+    :param profiler: An optional Profiler collecting per-stage and
+        per-page timings and counters, including from worker processes.
+    :param cache_dir: An optional directory caching parsed pages by
+        source hash, so unchanged sources are not parsed again, even by
+        a fresh build restoring the directory.
+    :param fingerprint: Whether to add a content hash to the names of
+        stylesheets, scripts, images and fonts, rewriting the links of
+        pages and the layout to them, so they can be cached forever.
+    :param minify: Whether to minify stylesheets, HTML assets and the
+        layout, in worker processes when jobs > 1.
+    :param listing_page_size: When given, listing pages linking to every
+        page, this many per listing page, are written to list/.
+    :param search_index: Whether to write a sharded search index of
+        every page to search/.
+    :return: The built, skipped, removed and generated outputs, and the
+        dead links found on every page, built or skipped.
+    """
+    if manifest_path is None:
+        manifest_path = default_manifest_path(output_dir)
+    stage = profiler.stage if profiler is not None else _no_stage
+    previous = Manifest.load(manifest_path)
+    current = Manifest()
+    result = BuildResult()
+
+    states: dict[str, DependencyState] = {}
+
+    def needs_build(
+        output: Path,
+        inputs: list[Path],
+        options: t.Optional[dict[str, t.Any]] = None,
+    ) -> bool:
+        dependencies = {}
+        for path in inputs:
+            key = str(path)
+            state = states.get(key)
+            if state is None:
+                state = states[key] = previous.dependency_state(path)
+            dependencies[key] = state
+        if options:
+            dependencies[OPTIONS_KEY] = {"hash": _options_hash(options)}
+        key = output.relative_to(output_dir).as_posix()
+        current.outputs[key] = dependencies
+        if incremental and previous.is_fresh(key, output, dependencies):
+            result.skipped.append(output)
+            return False
+        output.parent.mkdir(parents=True, exist_ok=True)
+        result.built.append(output)
+        return True
+
+    index = LinkIndex()
+    assets: dict[str, str] = {}
+    if static_dir is not None and static_dir.is_dir():
+        from assets import (
+            HTML_SUFFIXES,
+            MINIFIERS,
+            fingerprint_name,
+            rewrite_css_urls,
+            should_fingerprint,
+        )
+
+        with stage("assets"):
+            names: list[tuple[Path, str]] = []
+            stylesheets: list[tuple[Path, str]] = []
+            for source in sorted(static_dir.rglob("*")):
+                if not source.is_file():
+                    continue
+                name = source.relative_to(static_dir).as_posix()
+                if fingerprint and source.suffix.lower() == ".css":
+                    stylesheets.append((source, name))
+                    continue
+                if fingerprint and should_fingerprint(name):
+                    state = previous.dependency_state(source)
+                    states[str(source)] = state
+                    fingerprinted = fingerprint_name(
+                        name, state["hash"]
+                    )
+                    assets["/" + name] = "/" + fingerprinted
+                    names.append((source, fingerprinted))
+                else:
+                    names.append((source, name))
+            # Stylesheets are hashed once the assets they reference are
+            # renamed, with their url() references rewritten, so a
+            # changed font or image also renames the stylesheet.
+            for source, name in stylesheets:
+                css = rewrite_css_urls(
+                    source.read_text(encoding="utf-8"),
+                    "/" + name,
+                    assets,
+                )
+                digest = hashlib.sha256(css.encode("utf-8")).hexdigest()
+                fingerprinted = fingerprint_name(name, digest)
+                assets["/" + name] = "/" + fingerprinted
+                names.append((source, fingerprinted))
+            asset_jobs: list[tuple[Path, Path, str]] = []
+            for source, name in names:
+                url = "/" + name
+                index.add_target(url)
+                output = output_dir / name
+                suffix = source.suffix.lower()
+                asset_options: dict[str, t.Any] = {}
+                if minify and suffix in MINIFIERS:
+                    asset_options["minify"] = True
+                # Stylesheets are renamed when their references change,
+                # but HTML documents keep their names.
+                if assets and suffix in HTML_SUFFIXES:
+                    asset_options["assets"] = assets
+                if needs_build(output, [source], asset_options or None):
+                    asset_jobs.append((source, output, url))
+            _process_assets(asset_jobs, minify, assets, jobs)
+
+    layout = [template_path] if template_path is not None else []
+    current.options = {"assets": assets, "minify": minify}
+    options = current.options if fingerprint or minify else None
+    scanned: list[tuple[Path, Path, str, bool]] = []
+    with stage("scan"):
+        for source in sorted(content_dir.rglob("*.md")):
+            relative = output_name(source, content_dir)
+            url = "/" + relative.as_posix()
+            index.add_target(url)
+            output = output_dir / relative
+            built = needs_build(output, [source, *layout], options)
+            scanned.append((source, output, url, built))
+    pages = [
+        (source, output, url)
+        for source, output, url, built in scanned
+        if built
+    ]
+    summarize = listing_page_size is not None or search_index
+
+    def render_parallel() -> t.Iterator[PageResult]:
+        from concurrent.futures import ProcessPoolExecutor
+
+        sources, outputs, urls = zip(*pages)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield from executor.map(
+                write_page,
+                sources,
+                outputs,
+                urls,
+                [template_path] * len(pages),
+                [profiler is not None] * len(pages),
+                [cache_dir] * len(pages),
+                [assets] * len(pages),
+                [minify] * len(pages),
+                [summarize] * len(pages),
+                chunksize=max(1, len(pages) // (jobs * 4)),
+            )
+
+    def render_serial() -> t.Iterator[PageResult]:
+        with BatchWriter() as writer:
+            for source, output, url in pages:
+                links = PageLinks(url, assets)
+                record = PageRecord(url) if summarize else None
+                html = render_page(
+                    source, template, profiler, links, cache, record
+                )
+                writer.write(output, html.encode("utf-8"))
+                yield links, record, None
+            with stage("write"):
+                writer.close()
+        if profiler is not None:
+            profiler.count("writes_unchanged", writer.unchanged)
+
+    template = get_template(template_path, assets, minify)
+    cache: t.Optional["ASTCache"] = None
+    if cache_dir is not None:
+        from astcache import ASTCache
+
+        cache = ASTCache(cache_dir)
+    listing: t.Optional["ListingWriter"] = None
+    search: t.Optional["SearchIndexWriter"] = None
+    if summarize:
+        from listing import ListingWriter, PageRecord, SearchIndexWriter
+
+        if listing_page_size is not None:
+            listing = ListingWriter(
+                output_dir / LISTING_DIR,
+                f"/{LISTING_DIR}",
+                template,
+                listing_page_size,
+            )
+        if search_index:
+            search = SearchIndexWriter(output_dir / SEARCH_DIR)
+    rendered = (
+        render_parallel()
+        if jobs > 1 and len(pages) > 1
+        else render_serial()
+    )
+    for source, _, url, built in scanned:
+        record = None
+        if built:
+            links, record, report = next(rendered)
+            if profiler is not None and report is not None:
+                profiler.merge(report)
+        else:
+            # The page is unchanged, but the pages it links to may not
+            # be, so its links are checked again from the manifest.
+            links = PageLinks.from_dict(
+                url, previous.links.get(url, {})
+            )
+            if summarize:
+                record = summarize_page(
+                    source, url, cache, search_index
+                )
+        index.add_page(links)
+        current.links[url] = links.to_dict()
+        if record is not None:
+            if listing is not None:
+                listing.add(record)
+            if search is not None:
+                search.add(record)
+    for _ in rendered:
+        pass
+    with stage("listings"):
+        for writer in (listing, search):
+            if writer is not None:
+                for path in writer.close():
+                    key = path.relative_to(output_dir).as_posix()
+                    current.outputs[key] = {}
+                    result.generated.append(path)
+    result.dead_links = index.dead_links()
+    if profiler is not None:
+        profiler.count("outputs_built", len(result.built))
+        profiler.count("outputs_skipped", len(result.skipped))
+
+    for stale in sorted(set(previous.outputs) - set(current.outputs)):
+        stale_path = PurePosixPath(stale)
+        if stale_path.is_absolute() or ".." in stale_path.parts:
+            continue
+        path = output_dir / stale_path
+        if path.is_file():
+            path.unlink()
+            result.removed.append(path)
+
+    current.save(manifest_path)
+    return result
+
+
+def default_manifest_path(output_dir: Path) -> Path:
+    """
+    Returns where the manifest of an output directory is kept when no
+    path is given: beside the directory and named after it, so sibling
+    output directories do not share a manifest.
+
+    :param output_dir: The directory the site is written to.
+    :return: The path of the manifest file.
+    """
+    output_dir = output_dir.resolve()
+    return output_dir.with_name(f".{output_dir.name}.manifest.json")
+
+
+def output_name(source: Path, content_dir: Path) -> Path:
+    """
+    Returns the path of a page's output relative to the output
+    directory.
+
+    :param source: The Markdown file.
+    :param content_dir: The directory holding the Markdown sources.
+    :return: The relative path of the HTML page.
+    """
+    return source.relative_to(content_dir).with_suffix(".html")
+
+
+def get_template(
+    template_path: t.Optional[Path],
+    assets: t.Optional[dict[str, str]] = None,
+    minify: bool = False,
+) -> Template:
+    """
+    Returns the compiled layout for a layout file, or the default one.
+    The layout is compiled once per process and reused for every page.
+
+    :param template_path: The layout file, or None for the default.
+    :param assets: An optional mapping from asset URL to fingerprinted
+        URL, applied to the href and src attributes of the layout.
+    :param minify: Whether to minify the layout.
+    :return: The compiled Template.
+    """
+    if template_path is None:
+        template = DEFAULT_TEMPLATE
+    else:
+        template = load_template(template_path)
+    if not assets and not minify:
+        return template
+    return _transform_layout(
+        template, tuple(sorted((assets or {}).items())), minify
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _transform_layout(
+    template: Template,
+    assets: tuple[tuple[str, str], ...],
+    minify: bool,
+) -> Template:
+    """
+    Rewrites asset URLs in and minifies a layout, once per process.
+    """
+    from assets import minify_html, rewrite_asset_urls
+
+    if assets:
+        mapping = dict(assets)
+        template = template.transform(
+            lambda html: rewrite_asset_urls(html, mapping)
+        )
+    if minify:
+        template = template.transform(minify_html)
+    return template
+
+
+def write_page(
+    source: Path,
+    output: Path,
+    url: str,
+    template_path: t.Optional[Path] = None,
+    profile: bool = False,
+    cache_dir: t.Optional[Path] = None,
+    assets: t.Optional[dict[str, str]] = None,
+    minify: bool = False,
+    summarize: bool = False,
+) -> PageResult:
+    """
+    Renders a Markdown source file and writes the page unless the
+    output already holds the same bytes.
+
+    :return: The anchors and links of the page, its summary when
+        summarize is set, and its Profiler report when profile is set,
+        for worker processes to send back.
+    """
+    profiler: t.Optional["Profiler"] = None
+    cache: t.Optional["ASTCache"] = None
+    record: t.Optional["PageRecord"] = None
+    if profile:
+        from profiling import Profiler
+
+        profiler = Profiler()
+    if cache_dir is not None:
+        from astcache import ASTCache
+
+        cache = ASTCache(cache_dir)
+    if summarize:
+        from listing import PageRecord
+
+        record = PageRecord(url)
+    links = PageLinks(url, assets)
+    template = get_template(template_path, assets, minify)
+    html = render_page(source, template, profiler, links, cache, record)
+    if profiler is None:
+        write_if_changed(output, html.encode("utf-8"))
+        return links, record, None
+    with profiler.stage("write", str(source)):
+        if not write_if_changed(output, html.encode("utf-8")):
+            profiler.count("writes_unchanged")
+    return links, record, profiler.report()
+
+
+def summarize_page(
+    source: Path,
+    url: str,
+    cache: t.Optional["ASTCache"] = None,
+    terms: bool = True,
+) -> "PageRecord":
+    """
+    Builds the summary of a page that is not rendered in this build,
+    from the parse cache when possible.
+
+    Without the cache, the page is parsed lazily; when its terms are not
+    needed, parsing stops once the title and the excerpt are known.
+
+    :param source: The Markdown file.
+    :param url: The URL of the page.
+    :param cache: An optional cache of parsed documents.
+    :param terms: Whether the whole page is read for its search terms.
+    :return: The summary of the page.
+    """
+    from lazy import lazy_page
+    from listing import PageRecord
+
+    record = PageRecord(url)
+    if cache is not None:
+        from astcache import cache_key
+
+        document = cache.get(cache_key(file_hash(source), True))
+        if document is not None:
+            record.collect_document(document)
+            return record
+    for block in lazy_page(source, heading_ids=True).iter_children():
+        record.collect(block)
+        if not terms and record.listed:
+            break
+    return record
+
+
+def _process_assets(
+    pending: list[tuple[Path, Path, str]],
+    minify: bool,
+    assets: dict[str, str],
+    jobs: int,
+) -> None:
+    """
+    Copies, rewrites or minifies assets, in worker processes when
+    jobs > 1.
+
+    :param pending: The (source, output, URL) of each asset to process.
+    :param minify: Whether to minify stylesheets and HTML documents.
+    :param assets: A mapping from asset URL to fingerprinted URL, used
+        to rewrite the references of stylesheets and HTML documents.
+    :param jobs: The number of worker processes.
+    """
+    from assets import process_asset
+
+    if jobs > 1 and (minify or assets) and len(pending) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        sources, outputs, urls = zip(*pending)
+        count = len(pending)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for _ in executor.map(
+                process_asset,
+                sources,
+                outputs,
+                [minify] * count,
+                urls,
+                [assets] * count,
+            ):
+                pass
+        return
+    for source, output, url in pending:
+        process_asset(source, output, minify, url, assets)
+
+
+def _options_hash(options: dict[str, t.Any]) -> str:
+    """
+    Hashes the build options an output depends on.
+    """
+    encoded = json.dumps(options, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@contextlib.contextmanager
+def _no_stage(name: str) -> t.Iterator[None]:
+    """
+    Stands in for Profiler.stage when a build is not profiled.
+    """
+    yield
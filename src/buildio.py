@@ -0,0 +1,168 @@
+import mmap
+import os
+import shutil
+import typing as t
+from pathlib import Path
+
+if t.TYPE_CHECKING:
+    from concurrent.futures import Future
+
+MMAP_THRESHOLD = 1 << 20
+
+
+def iter_source_lines(
+    path: Path, mmap_threshold: int = MMAP_THRESHOLD
+) -> t.Iterator[str]:
+    """
+    Yields the lines of a UTF-8 source file, keeping their newlines.
+
+    Files of at least mmap_threshold bytes are memory-mapped, so lines
+    are decoded straight from the page cache without copying the file
+    into a read buffer first; smaller files use a regular buffered read.
+
+    :param path: The source file.
+    :param mmap_threshold: The size from which files are memory-mapped.
+    :return: An iterator over the lines of the file.
+    """
+    with open(path, "rb") as fp:
+        size = os.fstat(fp.fileno()).st_size
+        if size < mmap_threshold or size == 0:
+            for raw in fp:
+                yield raw.decode("utf-8")
+            return
+        with mmap.mmap(
+            fp.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            for raw in iter(mapped.readline, b""):
+                yield raw.decode("utf-8")
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Writes a file unless it already holds exactly the given bytes, so
+    unchanged outputs keep their modification time.
+
+    :param path: The file to write.
+    :param data: The new contents.
+    :return: True if the file was written, False if it was unchanged.
+    """
+    try:
+        if path.stat().st_size == len(data):
+            with open(path, "rb") as fp:
+                if fp.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    with open(path, "wb") as fp:
+        fp.write(data)
+    return True
+
+
+def copy_if_changed(source: Path, output: Path) -> bool:
+    """
+    Copies a file unless the output already has the same contents.
+
+    The copy goes through shutil.copyfile, which uses the kernel's
+    zero-copy primitives (sendfile on Linux, fcopyfile on macOS).
+
+    :param source: The file to copy.
+    :param output: The destination file.
+    :return: True if the file was copied, False if it was unchanged.
+    """
+    try:
+        if output.stat().st_size == source.stat().st_size and (
+            _same_contents(source, output)
+        ):
+            return False
+    except FileNotFoundError:
+        pass
+    shutil.copyfile(source, output)
+    return True
+
+
+def _same_contents(first: Path, second: Path) -> bool:
+    """
+    Compares two files of equal size chunk by chunk.
+    """
+    with open(first, "rb") as a, open(second, "rb") as b:
+        while True:
+            chunk = a.read(1 << 16)
+            if chunk != b.read(1 << 16):
+                return False
+            if not chunk:
+                return True
+
+
+class BatchWriter:
+    """
+    Collects output files and writes them in batches.
+
+    Pending writes are flushed to a small thread pool once they exceed
+    max_bytes, and when the writer is closed, so slow filesystems see
+    several writes in flight instead of one blocking write per page.
+    Files whose contents are unchanged are not rewritten.
+    """
+
+    def __init__(
+        self, max_bytes: int = 8 << 20, workers: int = 4
+    ) -> None:
+        """
+        Initializes a BatchWriter.
+
+        :param max_bytes: The pending size that triggers a flush.
+        :param workers: The number of threads performing writes.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.max_bytes = max_bytes
+        self.written = 0
+        self.unchanged = 0
+        self._pending: list[tuple[Path, bytes]] = []
+        self._pending_bytes = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures: list["Future[bool]"] = []
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def write(self, path: Path, data: bytes) -> None:
+        """
+        Queues a file to be written.
+
+        :param path: The file to write.
+        :param data: Its contents.
+        """
+        self._pending.append((path, data))
+        self._pending_bytes += len(data)
+        if self._pending_bytes >= self.max_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Hands every pending write to the thread pool.
+        """
+        for path, data in self._pending:
+            self._futures.append(
+                self._executor.submit(write_if_changed, path, data)
+            )
+        self._pending = []
+        self._pending_bytes = 0
+
+    def close(self) -> None:
+        """
+        Flushes pending writes and waits for all of them to finish,
+        re-raising the first error.
+        """
+        self.flush()
+        try:
+            for future in self._futures:
+                if future.result():
+                    self.written += 1
+                else:
+                    self.unchanged += 1
+        finally:
+            self._futures = []
+            self._executor.shutdown()
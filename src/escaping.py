@@ -0,0 +1,85 @@
+import functools
+import html
+import re
+import typing as t
+
+_TEXT_SPECIAL = re.compile(r"[&<>]")
+
+
+class SafeString(str):
+    """
+    A string that is already valid HTML and must not be escaped again.
+
+    escape_text returns its input unchanged when given a SafeString, so
+    pre-rendered markup can be placed in a LeafNode value as-is.
+    """
+
+    __slots__ = ()
+
+
+def escape_text(value: str) -> str:
+    """
+    Escapes a value for use as HTML text content.
+
+    Values without special characters are returned as they are, without
+    being copied, and SafeStrings are never escaped. Escaped results are
+    returned as SafeStrings so they are not escaped a second time.
+
+    :param value: The text to escape.
+    :return: The escaped text.
+    """
+    if type(value) is SafeString or not _TEXT_SPECIAL.search(value):
+        return value
+    return SafeString(html.escape(value, quote=False))
+
+
+def needs_escaping(value: str) -> bool:
+    """
+    Tells whether text content holds a character that must be escaped.
+
+    :param value: The text to check.
+    :return: True if escape_text would change the text.
+    """
+    return _TEXT_SPECIAL.search(value) is not None
+
+
+def escape_attribute(value: object) -> str:
+    """
+    Escapes a value for use inside a double-quoted HTML attribute.
+
+    :param value: The attribute value; non-strings are converted first.
+    :return: The escaped value.
+    """
+    return html.escape(str(value), quote=True)
+
+
+@functools.lru_cache(maxsize=4096)
+def _serialize_attributes(items: tuple[tuple[str, str], ...]) -> str:
+    """
+    Serializes attribute items, caching the result per distinct items.
+    """
+    return " ".join(
+        [f'{key}="{escape_attribute(value)}"' for key, value in items]
+    )
+
+
+def attributes_to_html(
+    props: t.Optional[t.Mapping[str, object]],
+) -> str:
+    """
+    Serializes a props dictionary to an HTML attribute string.
+
+    Results are cached by the props' keys and values converted to
+    strings, so identical attributes such as a repeated href are only
+    escaped and formatted once, values that compare equal but render
+    differently, such as 1 and True, never share an entry, and changing
+    a props dictionary simply produces a different cache key.
+
+    :param props: The attributes of a node, or None.
+    :return: The attributes as key="value" pairs separated by spaces.
+    """
+    if not props:
+        return ""
+    return _serialize_attributes(
+        tuple([(key, str(value)) for key, value in props.items()])
+    )
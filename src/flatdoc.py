@@ -0,0 +1,676 @@
+import itertools
+import json
+import operator
+import struct
+import sys
+import typing as t
+from array import array
+
+from blocks import iter_blocks
+from escaping import (
+    SafeString,
+    attributes_to_html,
+    escape_text,
+    needs_escaping,
+)
+from htmlnode import HTMLNode, LeafNode, ParentNode, walk
+
+LEAF = 0
+PARENT = 1
+SAFE_LEAF = 2
+NO_NODE = -1
+
+Props = dict[str, str | int]
+
+FORMAT_MAGIC = b"PYSTDOC\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHIII")
+_LENGTH = struct.Struct("<Q")
+_ARRAYS = (
+    "kinds",
+    "tags",
+    "props_ids",
+    "starts",
+    "ends",
+    "parents",
+    "first_children",
+    "next_siblings",
+)
+
+
+class FlatDocument:
+    """
+    A document tree stored as parallel arrays instead of node objects.
+
+    Nodes are numbered in document order. For every node the arrays hold
+    its kind (LEAF, PARENT, or SAFE_LEAF for a leaf whose value is a
+    SafeString), a tag id into tag_names, a props id into
+    props_table, the [start, end) offsets of its value in one shared text
+    buffer (start is -1 for no value), and the indices of its parent,
+    first child and next sibling (NO_NODE where there is none). Element
+    names and attribute dictionaries are stored once per document.
+    """
+
+    __slots__ = (
+        "kinds",
+        "tags",
+        "props_ids",
+        "starts",
+        "ends",
+        "parents",
+        "first_children",
+        "next_siblings",
+        "tag_names",
+        "props_table",
+        "_tag_ids",
+        "_props_ids",
+        "_chunks",
+        "_length",
+        "_text",
+        "_open",
+        "_last_child",
+    )
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty FlatDocument.
+        """
+        self.kinds = array("B")
+        self.tags = array("H")
+        self.props_ids = array("I")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.parents = array("i")
+        self.first_children = array("i")
+        self.next_siblings = array("i")
+        self.tag_names: list[t.Optional[str]] = []
+        self.props_table: list[t.Optional[Props]] = [None]
+        self._tag_ids: dict[t.Optional[str], int] = {}
+        self._props_ids: dict[
+            tuple[tuple[str, type, t.Any], ...], int
+        ] = {}
+        self._chunks: list[str] = []
+        self._length = 0
+        self._text: t.Optional[str] = ""
+        self._open: list[int] = []
+        self._last_child: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @property
+    def text(self) -> str:
+        """
+        The buffer holding the values of every node.
+        """
+        if self._text is None:
+            self._text = "".join(self._chunks)
+            self._chunks = [self._text]
+        return self._text
+
+    def _tag_id(self, tag: t.Optional[str]) -> int:
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = self._tag_ids[tag] = len(self.tag_names)
+            self.tag_names.append(tag)
+        return tag_id
+
+    def _props_id(self, props: t.Optional[Props]) -> int:
+        if props is None:
+            return 0
+        # Values that compare equal, such as 1 and True, are kept apart
+        # by their type, so every node keeps the value it was given.
+        key = tuple(
+            [
+                (name, type(value), value)
+                for name, value in props.items()
+            ]
+        )
+        try:
+            props_id = self._props_ids.get(key)
+        except TypeError:
+            self.props_table.append(props)
+            return len(self.props_table) - 1
+        if props_id is None:
+            props_id = self._props_ids[key] = len(self.props_table)
+            self.props_table.append(props)
+        return props_id
+
+    def _append(
+        self,
+        kind: int,
+        tag: t.Optional[str],
+        value: t.Optional[str],
+        props: t.Optional[Props],
+    ) -> int:
+        index = len(self.kinds)
+        parent = self._open[-1] if self._open else NO_NODE
+        if parent != NO_NODE:
+            previous = self._last_child[-1]
+            if previous == NO_NODE:
+                self.first_children[parent] = index
+            else:
+                self.next_siblings[previous] = index
+            self._last_child[-1] = index
+        elif index:
+            raise ValueError("a document has a single root node")
+        self.kinds.append(kind)
+        self.tags.append(self._tag_id(tag))
+        self.props_ids.append(self._props_id(props))
+        if value is None:
+            self.starts.append(-1)
+            self.ends.append(-1)
+        else:
+            self.starts.append(self._length)
+            self._length += len(value)
+            self.ends.append(self._length)
+            self._chunks.append(value)
+            self._text = None
+        self.parents.append(parent)
+        self.first_children.append(NO_NODE)
+        self.next_siblings.append(NO_NODE)
+        return index
+
+    def add_leaf(
+        self,
+        tag: t.Optional[str],
+        value: t.Optional[str],
+        props: t.Optional[Props] = None,
+    ) -> int:
+        """
+        Appends a leaf to the element opened last.
+
+        :param tag: The HTML tag of the leaf, or None for bare text.
+        :param value: The text content of the leaf.
+        :param props: A dictionary of attributes for the leaf.
+        :return: The index of the new node.
+        """
+        kind = SAFE_LEAF if type(value) is SafeString else LEAF
+        return self._append(kind, tag, value, props)
+
+    def open(
+        self, tag: t.Optional[str], props: t.Optional[Props] = None
+    ) -> int:
+        """
+        Appends an element to the element opened last; the nodes added
+        until the matching close() become its children.
+
+        :param tag: The HTML tag of the element.
+        :param props: A dictionary of attributes for the element.
+        :return: The index of the new node.
+        """
+        index = self._append(PARENT, tag, None, props)
+        self._open.append(index)
+        self._last_child.append(NO_NODE)
+        return index
+
+    def close(self) -> None:
+        """
+        Closes the element opened last.
+        """
+        if not self._open:
+            raise ValueError("no element is open")
+        self._open.pop()
+        self._last_child.pop()
+
+    def add_node(self, node: HTMLNode) -> int:
+        """
+        Appends a copy of an HTMLNode subtree to the element opened last.
+
+        :param node: The root of the subtree; LeafNodes and other nodes
+            without children become leaves, the rest become elements.
+        :return: The index of the subtree root.
+        """
+        root = NO_NODE
+        for entering, child in walk(node):
+            if not entering:
+                if child.children is not None:
+                    self.close()
+                continue
+            if child.children is None:
+                index = self.add_leaf(
+                    child.tag, child.value, child.props
+                )
+            else:
+                index = self.open(child.tag, child.props)
+            if root == NO_NODE:
+                root = index
+        return root
+
+    @classmethod
+    def from_node(cls, node: HTMLNode) -> "FlatDocument":
+        """
+        Converts an HTMLNode tree into a FlatDocument.
+
+        :param node: The root of the tree.
+        :return: The equivalent FlatDocument.
+        """
+        document = cls()
+        document.add_node(node)
+        return document
+
+    @classmethod
+    def from_blocks(
+        cls,
+        blocks: t.Iterable[HTMLNode],
+        tag: str = "div",
+        props: t.Optional[Props] = None,
+    ) -> "FlatDocument":
+        """
+        Builds a FlatDocument from a stream of blocks under one root
+        element. Each block is copied into the arrays as soon as it is
+        produced, so only one block exists as objects at a time.
+
+        :param blocks: The blocks, such as those yielded by iter_blocks.
+        :param tag: The tag of the root element.
+        :param props: A dictionary of attributes for the root element.
+        :return: The built FlatDocument.
+        """
+        document = cls()
+        document.open(tag, props)
+        for block in blocks:
+            document.add_node(block)
+        document.close()
+        return document
+
+    def value(self, index: int) -> t.Optional[str]:
+        """
+        Returns the value of a node.
+
+        :param index: The index of the node.
+        :return: The text content, or None.
+        """
+        start = self.starts[index]
+        if start < 0:
+            return None
+        return self.text[start : self.ends[index]]
+
+    def text_content(self, index: int = 0) -> str:
+        """
+        Returns the text of every leaf under a node, in document order.
+
+        :param index: The index of the subtree root.
+        :return: The concatenated leaf values.
+        """
+        kinds = self.kinds
+        return "".join(
+            self.value(i) or ""
+            for i in range(index, self._subtree_end(index))
+            if kinds[i] != PARENT
+        )
+
+    def iter_children(self, index: int) -> t.Iterator[int]:
+        """
+        Yields the indices of the children of a node.
+
+        :param index: The index of the node.
+        :return: An iterator over the child indices.
+        """
+        child = self.first_children[index]
+        next_siblings = self.next_siblings
+        while child != NO_NODE:
+            yield child
+            child = next_siblings[child]
+
+    def to_node(self, index: int = 0) -> HTMLNode:
+        """
+        Converts a node and its subtree back into HTMLNode objects.
+
+        :param index: The index of the subtree root; the document root
+            by default.
+        :return: The root of the equivalent LeafNode/ParentNode tree.
+        """
+        nodes: dict[int, HTMLNode] = {}
+        end = self._subtree_end(index)
+        for i in range(end - 1, index - 1, -1):
+            tag = self.tag_names[self.tags[i]]
+            props = self.props_table[self.props_ids[i]]
+            kind = self.kinds[i]
+            if kind == PARENT:
+                if tag is None:
+                    raise ValueError("ParentNode must have a tag")
+                nodes[i] = ParentNode.trusted(
+                    tag,
+                    [
+                        nodes.pop(child)
+                        for child in self.iter_children(i)
+                    ],
+                    props,
+                )
+            elif kind == LEAF:
+                nodes[i] = LeafNode.trusted(tag, self.value(i), props)
+            elif kind == SAFE_LEAF:
+                value = self.value(i)
+                nodes[i] = LeafNode.trusted(
+                    tag,
+                    None if value is None else SafeString(value),
+                    props,
+                )
+        return nodes[index]
+
+    def _subtree_end(self, index: int) -> int:
+        """
+        Returns the index following the last node of a subtree.
+        """
+        parents = self.parents
+        while index != NO_NODE:
+            following = self.next_siblings[index]
+            if following != NO_NODE:
+                return following
+            index = parents[index]
+        return len(self.kinds)
+
+    def _render(self, emit: t.Callable[[str], object]) -> None:
+        """
+        Emits the HTML of the whole document in one pass over the arrays,
+        keeping only the indices of the open elements on a stack. Start
+        tags are built once per tag and attribute combination, and text
+        is only escaped when the buffer holds a special character.
+        """
+        if self._open:
+            raise ValueError("the document has unclosed elements")
+        tags = self.tags
+        first_children = self.first_children
+        text = self.text
+        escape = needs_escaping(text)
+        opening: dict[int, str] = {}
+        closing = [f"</{name}>" for name in self.tag_names]
+        stack: list[int] = []
+        top = NO_NODE
+        for index, kind, tag_id, props_id, start, end, parent in zip(
+            itertools.count(),
+            self.kinds,
+            tags,
+            self.props_ids,
+            self.starts,
+            self.ends,
+            self.parents,
+        ):
+            while top != parent:
+                emit(closing[tags[top]])
+                stack.pop()
+                top = stack[-1] if stack else NO_NODE
+            key = props_id << 16 | tag_id
+            start_tag = opening.get(key)
+            if start_tag is None:
+                start_tag = opening[key] = self._start_tag(index)
+            if kind == PARENT:
+                if first_children[index] == NO_NODE:
+                    raise ValueError("ParentNode must have children")
+                emit(start_tag)
+                stack.append(index)
+                top = index
+                continue
+            if start < 0:
+                raise ValueError("LeafNode must have a value")
+            value = text[start:end]
+            if escape and kind == LEAF:
+                value = escape_text(value)
+            if start_tag:
+                emit(f"{start_tag}{value}{closing[tag_id]}")
+            else:
+                emit(value)
+        for index in reversed(stack):
+            emit(closing[tags[index]])
+
+    def _start_tag(self, index: int) -> str:
+        """
+        Returns the start tag of a node, or an empty string for bare
+        text.
+        """
+        name = self.tag_names[self.tags[index]]
+        props = self.props_table[self.props_ids[index]]
+        if name is None:
+            if self.kinds[index] == PARENT:
+                raise ValueError("ParentNode must have a tag")
+            return ""
+        if props:
+            return f"<{name} {attributes_to_html(props)}>"
+        return f"<{name}>"
+
+    def to_html(self) -> str:
+        """
+        Renders the document to HTML, exactly as to_node().to_html()
+        would.
+
+        :return: The HTML string representation of the document.
+        """
+        parts: list[str] = []
+        self._render(parts.append)
+        return "".join(parts)
+
+    def write_html(self, fp: t.TextIO) -> None:
+        """
+        Writes the HTML of the document to a text stream.
+
+        :param fp: A writable text stream, such as an open file.
+        """
+        self._render(fp.write)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the document to a compact, versioned binary format.
+
+        The format is a header with the format version and the node,
+        tag and attribute counts, followed by the tag names, the
+        attribute table as JSON, the UTF-8 text buffer, and the raw
+        little-endian contents of every array. Only strings, numbers and
+        the arrays are stored, so loading never executes code.
+
+        :return: The serialized document.
+        :raises TypeError: If an attribute value is not JSON-serializable.
+        """
+        if self._open:
+            raise ValueError("the document has unclosed elements")
+        names = json.dumps(self.tag_names).encode("utf-8")
+        props = json.dumps(self.props_table[1:]).encode("utf-8")
+        text = self.text.encode("utf-8")
+        parts = [
+            _HEADER.pack(
+                FORMAT_MAGIC,
+                FORMAT_VERSION,
+                len(self.kinds),
+                len(self.tag_names),
+                len(self.props_table),
+            )
+        ]
+        for section in (names, props, text):
+            parts.append(_LENGTH.pack(len(section)))
+            parts.append(section)
+        for name in _ARRAYS:
+            values: "array[int]" = getattr(self, name)
+            if sys.byteorder == "big":
+                values = array(values.typecode, values)
+                values.byteswap()
+            parts.append(values.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FlatDocument":
+        """
+        Loads a document serialized by to_bytes().
+
+        :param data: The serialized document.
+        :return: The loaded FlatDocument.
+        :raises ValueError: If the data is not a document, was written
+            by another format version, or is truncated or corrupt.
+        """
+        view = memoryview(data)
+        if len(view) < _HEADER.size:
+            raise ValueError("truncated document")
+        magic, version, nodes, tag_count, props_count = (
+            _HEADER.unpack_from(view)
+        )
+        if magic != FORMAT_MAGIC:
+            raise ValueError("not a serialized document")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported document version {version}")
+        offset = _HEADER.size
+        sections = []
+        for _ in range(3):
+            if offset + _LENGTH.size > len(view):
+                raise ValueError("truncated document")
+            (length,) = _LENGTH.unpack_from(view, offset)
+            offset += _LENGTH.size
+            sections.append(bytes(view[offset : offset + length]))
+            offset += length
+        document = cls()
+        for name in _ARRAYS:
+            values: "array[int]" = getattr(document, name)
+            end = offset + values.itemsize * nodes
+            if end > len(view):
+                raise ValueError("truncated document")
+            values.frombytes(view[offset:end])
+            if sys.byteorder == "big":
+                values.byteswap()
+            offset = end
+        if offset != len(view):
+            raise ValueError("trailing data after document")
+        tag_names = json.loads(sections[0])
+        props_table = json.loads(sections[1])
+        if (
+            not isinstance(tag_names, list)
+            or not isinstance(props_table, list)
+            or len(tag_names) != tag_count
+            or len(props_table) + 1 != props_count
+            or not all(
+                name is None or isinstance(name, str)
+                for name in tag_names
+            )
+            or not all(isinstance(props, dict) for props in props_table)
+        ):
+            raise ValueError("corrupt document tables")
+        document.tag_names = tag_names
+        document.props_table = [None, *props_table]
+        document._tag_ids = {
+            name: index for index, name in enumerate(document.tag_names)
+        }
+        text = sections[2].decode("utf-8")
+        document._chunks = [text]
+        document._length = len(text)
+        document._text = text
+        document._validate()
+        return document
+
+    def _validate(self) -> None:
+        """
+        Checks that the arrays describe a single tree numbered in
+        document order and that every id and offset points into its
+        table or the text, so that a corrupt document fails to load
+        rather than when it is traversed.
+
+        :raises ValueError: If the document is inconsistent.
+        """
+        count = len(self.kinds)
+        if not count:
+            return
+        kinds = self.kinds
+        if not set(kinds) <= {LEAF, PARENT, SAFE_LEAF}:
+            raise ValueError("corrupt node kinds")
+        # Tag and props ids are unsigned, so only their maximum needs
+        # checking.
+        if max(self.tags) >= len(self.tag_names):
+            raise ValueError("corrupt tag ids")
+        if max(self.props_ids) >= len(self.props_table):
+            raise ValueError("corrupt props ids")
+        starts = self.starts
+        ends = self.ends
+        if (
+            min(starts) < NO_NODE
+            or max(ends) > len(self.text)
+            or not all(map(operator.le, starts, ends))
+        ):
+            raise ValueError("corrupt value offsets")
+        # Walking the nodes in order with the stack of open elements,
+        # as _render() does, each node must be the first child of the
+        # node before it or the next sibling of the last node closed.
+        # Every other link must be NO_NODE.
+        parents = self.parents
+        first_children = self.first_children
+        next_siblings = self.next_siblings
+        if parents[0] != NO_NODE:
+            raise ValueError("corrupt document structure")
+        stack = [0]
+        pop = stack.pop
+        push = stack.append
+        try:
+            for index, parent in enumerate(
+                itertools.islice(parents, 1, None), 1
+            ):
+                if parent == index - 1:
+                    if (
+                        kinds[parent] != PARENT
+                        or first_children[parent] != index
+                    ):
+                        raise ValueError("corrupt document structure")
+                else:
+                    previous = pop()
+                    while stack[-1] != parent:
+                        previous = pop()
+                    if next_siblings[previous] != index:
+                        raise ValueError("corrupt document structure")
+                push(index)
+        except IndexError:
+            raise ValueError("corrupt document structure") from None
+        links = 2 * count - (
+            first_children.count(NO_NODE) + next_siblings.count(NO_NODE)
+        )
+        if links != count - 1:
+            raise ValueError("corrupt document structure")
+
+    def __eq__(self, value: object) -> bool:
+        """
+        Compares two documents node by node.
+
+        The structure is compared as whole arrays; tags, attributes and
+        values are compared through the tables only where the two
+        documents do not share them.
+        """
+        if not isinstance(value, FlatDocument):
+            return NotImplemented
+        if self.kinds != value.kinds or self.parents != value.parents:
+            return False
+        same_tags = self.tag_names == value.tag_names
+        if same_tags and self.tags != value.tags:
+            return False
+        same_text = (
+            self.starts == value.starts
+            and self.ends == value.ends
+            and self.text == value.text
+        )
+        for index in range(len(self.kinds)):
+            if not same_tags and (
+                self.tag_names[self.tags[index]]
+                != value.tag_names[value.tags[index]]
+            ):
+                return False
+            if (
+                self.props_table[self.props_ids[index]]
+                != value.props_table[value.props_ids[index]]
+            ):
+                return False
+            if not same_text and self.value(index) != value.value(
+                index
+            ):
+                return False
+        return True
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def markdown_to_document(markdown: str) -> FlatDocument:
+    """
+    Parses a Markdown document straight into a FlatDocument, equivalent
+    to FlatDocument.from_node(markdown_to_html_node(markdown)).
+
+    :param markdown: The Markdown source.
+    :return: The document, with a div as its root.
+    """
+    document = FlatDocument()
+    document.open("div")
+    for block in iter_blocks(markdown.splitlines()):
+        document.add_node(block)
+    if len(document) == 1:
+        document.add_leaf(None, "")
+    document.close()
+    return document
@@ -1,12 +1,19 @@
+import sys
 import typing as t
 from textnode import TextType, TextNode
+from escaping import attributes_to_html, escape_text
 
 
 class HTMLNode:
     """
     A class representing a node in an HTML document.
+
+    Nodes use __slots__ instead of a per-instance __dict__, and nodes
+    without attributes keep props as None rather than an empty dict.
     """
 
+    __slots__ = ("tag", "value", "props", "children")
+
     def __init__(
         self,
         tag: t.Optional[str] = None,
@@ -22,10 +29,12 @@ class HTMLNode:
         :param children: A list of child nodes.
         :param props: A dictionary of attributes for the node.
         """
-        self.tag = tag
+        self.tag = sys.intern(tag) if type(tag) is str else tag
         self.value = value
         self.props = props
-        self.children = children
+        # A sequence rather than a list, so subclasses such as
+        # LazyParentNode can produce their children on demand.
+        self.children: t.Optional[t.Sequence[HTMLNode]] = children
 
         if not isinstance(tag, (str, type(None))):
             raise ValueError("tag must be a string")
@@ -46,23 +55,47 @@ class HTMLNode:
 
         :return: The HTML string representation of the node.
         """
+        return "".join(self.iter_html())
+
+    def iter_html(self) -> t.Iterator[str]:
+        """
+        Yields the HTML representation of the node as fragments, in
+        document order, without building intermediate subtree strings.
+
+        The tree is traversed with walk(), so rendering depth is not
+        bounded by the interpreter recursion limit.
+
+        :return: An iterator over the HTML fragments of the node.
+        """
+        for entering, node in walk(self):
+            if entering:
+                yield node._start_html()
+            else:
+                end = node._end_html()
+                if end:
+                    yield end
+
+    def _start_html(self) -> str:
+        """
+        Returns the HTML emitted when the traversal enters the node.
+        """
         raise NotImplementedError(
             "Subclasses should implement this method"
         )
-        # Example implementation:
-        # if self.tag is None:
-        #     return self.value or ""
-        # opening_tag = f"<{self.tag}"
-        # if self.props:
-        #     props_str = " ".join([f'{key}="{value}"' for key, value in self.props.items()])
-        #     opening_tag += f" {props_str}"
-        # opening_tag += ">"
-        # closing_tag = f"</{self.tag}>"
-        # if self.children:
-        #     children_str = "".join(child.to_html() for child in self.children)
-        # else:
-        #     children_str = self.value or ""
-        # return f"{opening_tag}{children_str}{closing_tag}"
+
+    def _end_html(self) -> str:
+        """
+        Returns the HTML emitted when the traversal leaves the node.
+        """
+        return ""
+
+    def write_html(self, fp: t.TextIO) -> None:
+        """
+        Writes the HTML representation of the node to a text stream.
+
+        :param fp: A writable text stream, such as an open file.
+        """
+        fp.writelines(self.iter_html())
 
     def props_to_html(self) -> str:
         """
@@ -70,14 +103,7 @@ class HTMLNode:
 
         :return: The HTML string representation of the props.
         """
-        if self.props:
-            return " ".join(
-                [
-                    f'{key}="{value}"'
-                    for key, value in self.props.items()
-                ]
-            )
-        return ""
+        return attributes_to_html(self.props)
 
     def __repr__(self):
         """
@@ -85,7 +111,26 @@ class HTMLNode:
 
         :return: A string representation of the HTMLNode.
         """
-        return f"HTMLNode(tag={self.tag}, value={self.value}, props={self.props}, children={self.children})"
+        parts = []
+        first_child = [True]
+        for entering, node in walk(self):
+            if entering:
+                if not first_child[-1]:
+                    parts.append(", ")
+                first_child[-1] = False
+                parts.append(
+                    f"HTMLNode(tag={node.tag}, value={node.value}, "
+                    f"props={node.props}, children="
+                )
+                if node.children:
+                    parts.append("[")
+                    first_child.append(True)
+                else:
+                    parts.append(f"{node.children})")
+            elif node.children:
+                first_child.pop()
+                parts.append("])")
+        return "".join(parts)
 
     def __eq__(self, value):
         """
@@ -96,12 +141,91 @@ class HTMLNode:
         """
         if not isinstance(value, HTMLNode):
             return False
-        return (
-            self.tag == value.tag
-            and self.value == value.value
-            and self.props == value.props
-            and self.children == value.children
-        )
+        for (entering, node), (other_entering, other) in zip(
+            walk(self), walk(value)
+        ):
+            if entering != other_entering:
+                return False
+            if entering and (
+                node.tag != other.tag
+                or node.value != other.value
+                or node.props != other.props
+                or (node.children is None) != (other.children is None)
+            ):
+                return False
+        return True
+
+    def __hash__(self) -> int:
+        """
+        Returns a structural hash of the node and its whole subtree,
+        consistent with __eq__.
+
+        Nodes are mutable: a node must not be changed while it is used
+        as a dictionary key or in a set.
+
+        :return: The hash of the node.
+        """
+        # The hashes of the children of every open node, innermost
+        # last; the outer list collects the hash of the node itself.
+        child_hashes: list[list[int]] = [[]]
+        for entering, node in walk(self):
+            if entering:
+                child_hashes.append([])
+                continue
+            children = tuple(child_hashes.pop())
+            props = node.props
+            child_hashes[-1].append(
+                hash(
+                    (
+                        node.tag,
+                        node.value,
+                        frozenset(props.items()) if props else None,
+                        node.children is None,
+                        children,
+                    )
+                )
+            )
+        return child_hashes[0][0]
+
+
+def walk(root: HTMLNode) -> t.Iterator[tuple[bool, HTMLNode]]:
+    """
+    Traverses a node tree depth-first using an explicit stack.
+
+    Yields an (entering, node) pair when the traversal enters a node and
+    another when it leaves it, so callers can emit opening and closing
+    output without recursing. Trees of any depth can be walked.
+
+    :param root: The node to start the traversal from.
+    :return: An iterator over (entering, node) events.
+    """
+    yield True, root
+    stack = [(root, iter(root.children or ()))]
+    while stack:
+        parent, children = stack[-1]
+        for child in children:
+            yield True, child
+            if child.children:
+                stack.append((child, iter(child.children)))
+                break
+            yield False, child
+        else:
+            stack.pop()
+            yield False, parent
+
+
+def text_content(node: HTMLNode) -> str:
+    """
+    Returns the text of every leaf under a node, in document order.
+
+    :param node: The root of the subtree.
+    :return: The concatenated leaf values.
+    """
+    return "".join(
+        child.value or ""
+        for entering, child in walk(node)
+        if entering and child.children is None
+    )
 
 
 class LeafNode(HTMLNode):
@@ -109,6 +233,8 @@ class LeafNode(HTMLNode):
     A class representing a leaf node in an HTML document.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         tag: t.Optional[str],
@@ -125,28 +251,52 @@ class LeafNode(HTMLNode):
         """
         super().__init__(tag, value, props)
 
+    @classmethod
+    def trusted(
+        cls,
+        tag: t.Optional[str],
+        value: t.Optional[str],
+        props: t.Optional[dict[str, str | int]] = None,
+    ) -> "LeafNode":
+        """
+        Builds a LeafNode without validating its arguments.
+
+        Meant for internal code paths that only produce well-formed
+        nodes; user code should call LeafNode().
+        """
+        node = cls.__new__(cls)
+        node.tag = tag
+        node.value = value
+        node.props = props
+        node.children = None
+        return node
+
     def to_html(self) -> str:
         """
         Converts the LeafNode to an HTML string representation.
+
         :return: The HTML string representation of the node.
         """
+        return self._start_html()
+
+    def _start_html(self) -> str:
+        """
+        Converts the LeafNode to an HTML string representation. The
+        value is escaped unless it is a SafeString.
 
+        :return: The HTML string representation of the node.
+        """
         if self.value is None:
             raise ValueError("LeafNode must have a value")
+        value = escape_text(self.value)
         if self.tag is None:
-            return self.value
-        opening_tag = f"<{self.tag}"
+            return value
         if self.props:
-            props_str = " ".join(
-                [
-                    f'{key}="{value}"'
-                    for key, value in self.props.items()
-                ]
+            return (
+                f"<{self.tag} {attributes_to_html(self.props)}>"
+                f"{value}</{self.tag}>"
             )
-            opening_tag += f" {props_str}"
-        opening_tag += ">"
-        closing_tag = f"</{self.tag}>"
-        return f"{opening_tag}{self.value}{closing_tag}"
+        return f"<{self.tag}>{value}</{self.tag}>"
 
 
 class ParentNode(HTMLNode):
@@ -154,6 +304,8 @@ class ParentNode(HTMLNode):
     A class representing a parent node in an HTML document.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         tag: str,
@@ -169,63 +321,130 @@ class ParentNode(HTMLNode):
         """
         super().__init__(tag, None, props, children)
 
-    def to_html(self) -> str:
+    @classmethod
+    def trusted(
+        cls,
+        tag: str,
+        children: list[HTMLNode],
+        props: t.Optional[dict[str, str | int]] = None,
+    ) -> "ParentNode":
         """
-        Converts the ParentNode to an HTML string representation.
+        Builds a ParentNode without validating its arguments.
 
-        :return: The HTML string representation of the node.
+        Meant for internal code paths that only produce well-formed
+        nodes; user code should call ParentNode().
+        """
+        node = cls.__new__(cls)
+        node.tag = tag
+        node.value = None
+        node.props = props
+        node.children = children
+        return node
+
+    def _start_html(self) -> str:
+        """
+        Returns the opening tag of the ParentNode.
+
+        :return: The opening tag, including its attributes.
         """
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         if not self.children:
             raise ValueError("ParentNode must have children")
-        opening_tag = f"<{self.tag}"
-
         if self.props:
-            props_str = " ".join(
-                [
-                    f'{key}="{value}"'
-                    for key, value in self.props.items()
-                ]
-            )
-            opening_tag += f" {props_str}"
-        opening_tag += ">"
-        closing_tag = f"</{self.tag}>"
-        children_str = "".join(
-            child.to_html() for child in self.children
-        )
-        return f"{opening_tag}{children_str}{closing_tag}"
+            return f"<{self.tag} {attributes_to_html(self.props)}>"
+        return f"<{self.tag}>"
+
+    def _end_html(self) -> str:
+        """
+        Returns the closing tag of the ParentNode.
+
+        :return: The closing tag.
+        """
+        return f"</{self.tag}>"
+
+
+InlineFactory = t.Callable[[TextNode], HTMLNode]
+
+INLINE_FACTORIES: dict[TextType, InlineFactory] = {}
+
+
+def register_inline_type(
+    text_type: TextType, factory: InlineFactory
+) -> None:
+    """
+    Registers the factory converting TextNodes of a type to HTMLNodes,
+    replacing any factory registered before for that type.
+
+    :param text_type: The inline type.
+    :param factory: Called with each TextNode of that type.
+    """
+    INLINE_FACTORIES[text_type] = factory
+
+
+def leaf_factory(tag: t.Optional[str]) -> InlineFactory:
+    """
+    Returns a factory wrapping the text of a TextNode in a LeafNode.
+
+    :param tag: The HTML tag of the leaves, or None for bare text.
+    :return: The factory.
+    """
+    return lambda node: LeafNode.trusted(tag, node.text)
+
+
+def _image_node(node: TextNode) -> HTMLNode:
+    if node.url is None:
+        raise ValueError("URL must be provided for IMAGE text type")
+    return LeafNode.trusted(
+        "img", "", {"src": node.url, "alt": node.text}
+    )
+
+
+def _link_node(node: TextNode) -> HTMLNode:
+    if node.url is None:
+        raise ValueError("URL must be provided for LINK text type")
+    return LeafNode.trusted("a", node.text, {"href": node.url})
+
+
+register_inline_type(TextType.TEXT, leaf_factory(None))
+register_inline_type(TextType.BOLD, leaf_factory("b"))
+register_inline_type(TextType.ITALIC, leaf_factory("i"))
+register_inline_type(TextType.CODE, leaf_factory("code"))
+register_inline_type(TextType.STRIKETHROUGH, leaf_factory("s"))
+register_inline_type(TextType.IMAGE, _image_node)
+register_inline_type(TextType.LINK, _link_node)
 
 
 def text_node_to_html_node(node: TextNode) -> HTMLNode:
     """
-    Converts a TextNode to an HTMLNode.
+    Converts a TextNode to an HTMLNode, using the factory registered
+    for its type.
 
     :param node: The TextNode to convert.
     :return: The converted HTMLNode.
     """
-    match (node.textType):
-        case TextType.TEXT:
-            return LeafNode(None, node.text)
-        case TextType.BOLD:
-            return LeafNode("b", node.text)
-        case TextType.ITALIC:
-            return LeafNode("i", node.text)
-        case TextType.CODE:
-            return LeafNode("code", node.text)
-        case TextType.IMAGE:
-            if node.url is None:
-                raise ValueError(
-                    "URL must be provided for IMAGE text type"
-                )
-            return LeafNode(
-                "img", "", {"src": node.url, "alt": node.text}
-            )
-        case TextType.LINK:
-            if node.url is None:
-                raise ValueError(
-                    "URL must be provided for LINK text type"
-                )
-            return LeafNode("a", node.text, {"href": node.url})
-        case _:
+    factory = INLINE_FACTORIES.get(node.textType)
+    if factory is None:
+        raise ValueError(f"Unsupported text type: {node.textType}")
+    return factory(node)
+
+
+def text_nodes_to_html_nodes(
+    nodes: t.Iterable[TextNode],
+) -> list[HTMLNode]:
+    """
+    Converts a sequence of TextNodes to HTMLNodes in one call, looking
+    each factory up in the registry table.
+
+    :param nodes: The TextNodes to convert.
+    :return: The converted HTMLNodes, in order.
+    """
+    get_factory = INLINE_FACTORIES.get
+    html_nodes: list[HTMLNode] = []
+    append = html_nodes.append
+    for node in nodes:
+        factory = get_factory(node.textType)
+        if factory is None:
             raise ValueError(f"Unsupported text type: {node.textType}")
+        append(factory(node))
+    return html_nodes
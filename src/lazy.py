@@ -0,0 +1,174 @@
+import typing as t
+from pathlib import Path
+
+from blocks import iter_blocks
+from buildio import iter_source_lines
+from htmlnode import HTMLNode, ParentNode
+
+ELLIPSIS = "…"
+
+
+class LazyChildren(t.Sequence[HTMLNode]):
+    """
+    A read-only view of the children of a LazyParentNode.
+
+    Iterating the view produces children on demand, and truth testing
+    only produces the first one, so walk() and the renderers stream a
+    lazy node without materializing all of its children up front.
+    """
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node: "LazyParentNode") -> None:
+        self._node = node
+
+    def __iter__(self) -> t.Iterator[HTMLNode]:
+        return self._node.iter_children()
+
+    def __bool__(self) -> bool:
+        return next(self._node.iter_children(), None) is not None
+
+    def __len__(self) -> int:
+        return len(self._node.materialize())
+
+    @t.overload
+    def __getitem__(self, index: int) -> HTMLNode: ...
+
+    @t.overload
+    def __getitem__(self, index: slice) -> list[HTMLNode]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> HTMLNode | list[HTMLNode]:
+        return self._node.materialize()[index]
+
+    def __eq__(self, value: object) -> bool:
+        if isinstance(value, LazyChildren):
+            value = value._node.materialize()
+        return self._node.materialize() == value
+
+    def __repr__(self) -> str:
+        return repr(self._node.materialize())
+
+
+class LazyParentNode(ParentNode):
+    """
+    A parent node whose children are produced from a source only when
+    the node is traversed or rendered.
+
+    The factory is called on first access and its iterable is consumed
+    one child at a time; children produced so far are kept, so the node
+    can be traversed again. Assigning children replaces the factory.
+    """
+
+    __slots__ = ("_factory", "_iterator", "_loaded")
+
+    def __init__(
+        self,
+        tag: str,
+        factory: t.Callable[[], t.Iterable[HTMLNode]],
+        props: t.Optional[dict[str, str | int]] = None,
+    ) -> None:
+        """
+        Initializes a LazyParentNode without producing any children.
+
+        :param tag: The HTML tag of the node.
+        :param factory: A callable returning an iterable of the children.
+        :param props: A dictionary of attributes for the node.
+        """
+        super().__init__(tag, [], props)
+        if not callable(factory):
+            raise ValueError("factory must be callable")
+        self._factory: t.Optional[
+            t.Callable[[], t.Iterable[HTMLNode]]
+        ] = factory
+        self._iterator: t.Optional[t.Iterator[HTMLNode]] = None
+        self._loaded: list[HTMLNode] = []
+
+    @property
+    def children(self) -> t.Sequence[HTMLNode]:
+        return LazyChildren(self)
+
+    @children.setter
+    def children(self, value: t.Optional[t.Sequence[HTMLNode]]) -> None:
+        self._factory = None
+        self._iterator = None
+        self._loaded = list(value or ())
+
+    @property
+    def is_materialized(self) -> bool:
+        """
+        Whether every child has been produced.
+        """
+        return self._factory is None
+
+    def iter_children(self) -> t.Iterator[HTMLNode]:
+        """
+        Yields the children, producing new ones from the factory only
+        once the ones produced so far are exhausted.
+
+        :return: An iterator over the children.
+        """
+        loaded = self._loaded
+        index = 0
+        while True:
+            while index < len(loaded):
+                yield loaded[index]
+                index += 1
+            if self._factory is None:
+                return
+            if self._iterator is None:
+                self._iterator = iter(self._factory())
+            child = next(self._iterator, None)
+            if child is None:
+                self._factory = None
+                self._iterator = None
+                return
+            if not isinstance(child, HTMLNode):
+                raise ValueError(
+                    "all children must be HTMLNode instances"
+                )
+            loaded.append(child)
+
+    def materialize(self) -> list[HTMLNode]:
+        """
+        Produces every remaining child.
+
+        :return: The list of all children.
+        """
+        for _ in self.iter_children():
+            pass
+        return self._loaded
+
+
+def lazy_page(
+    source: Path, heading_ids: bool = False
+) -> LazyParentNode:
+    """
+    Returns the body of a Markdown page as a lazy div, whose blocks are
+    parsed from the source as they are traversed.
+
+    :param source: The Markdown file.
+    :param heading_ids: Whether headings get anchor ids.
+    :return: A LazyParentNode holding one child per block.
+    """
+    return LazyParentNode(
+        "div",
+        lambda: iter_blocks(iter_source_lines(source), heading_ids),
+    )
+
+
+def truncate_text(text: str, limit: int) -> str:
+    """
+    Cuts text to at most limit characters, preferring a word boundary,
+    and appends an ellipsis.
+
+    :param text: The text to cut.
+    :param limit: The number of characters to keep.
+    :return: The cut text followed by an ellipsis.
+    """
+    cut = text[:limit]
+    space = cut.rfind(" ")
+    if space > 0:
+        cut = cut[:space]
+    return cut.rstrip() + ELLIPSIS
@@ -0,0 +1,247 @@
+import posixpath
+import re
+import typing as t
+from urllib.parse import urlsplit
+
+from htmlnode import HTMLNode, walk
+
+if t.TYPE_CHECKING:
+    from flatdoc import FlatDocument
+
+_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_SLUG_SPACES = re.compile(r"[\s-]+")
+_HEADING_TAGS = frozenset(f"h{level}" for level in range(1, 7))
+_LINK_PROPS = ("href", "src")
+
+
+def slugify(text: str) -> str:
+    """
+    Turns heading text into an anchor id.
+
+    :param text: The heading text.
+    :return: A lowercase id made of word characters and hyphens.
+    """
+    text = _SLUG_STRIP.sub("", text.lower())
+    return _SLUG_SPACES.sub("-", text).strip("-") or "section"
+
+
+def resolve_link(page_url: str, href: str) -> t.Optional[str]:
+    """
+    Resolves a link found on a page to a site-absolute URL.
+
+    Relative paths are resolved against the page, links to Markdown
+    sources are pointed at their HTML output, and a bare fragment refers
+    to the page itself.
+
+    :param page_url: The URL of the page holding the link.
+    :param href: The link target.
+    :return: The absolute URL, including any fragment, or None for
+        external links such as https: or mailto: URLs.
+    """
+    parts = urlsplit(href)
+    if parts.scheme or parts.netloc:
+        return None
+    path = parts.path
+    if not path:
+        path = page_url
+    elif not path.startswith("/"):
+        trailing = "/" if path.endswith("/") else ""
+        path = posixpath.normpath(
+            posixpath.join(posixpath.dirname(page_url), path)
+        )
+        path += trailing if path != "/" else ""
+    if path.endswith(".md"):
+        path = path[:-3] + ".html"
+    if parts.query:
+        path += f"?{parts.query}"
+    return f"{path}#{parts.fragment}" if parts.fragment else path
+
+
+def fingerprinted_url(url: str, assets: dict[str, str]) -> str:
+    """
+    Returns the fingerprinted form of a site-absolute URL, keeping its
+    query string and fragment, or the URL itself if it is not an asset.
+
+    :param url: The URL.
+    :param assets: A mapping from asset URL to fingerprinted URL.
+    :return: The URL to link to.
+    """
+    end = len(url)
+    for separator in "?#":
+        position = url.find(separator)
+        if position != -1:
+            end = min(end, position)
+    path = assets.get(url[:end])
+    return url if path is None else path + url[end:]
+
+
+class PageLinks:
+    """
+    The anchors and internal links found on one page.
+    """
+
+    __slots__ = ("url", "anchors", "links", "assets")
+
+    def __init__(
+        self, url: str, assets: t.Optional[dict[str, str]] = None
+    ) -> None:
+        """
+        Initializes an empty record for a page.
+
+        :param url: The site-absolute URL of the page.
+        :param assets: An optional mapping from asset URL to
+            fingerprinted URL; links to those assets are rewritten to
+            point at the fingerprinted files.
+        """
+        self.url = url
+        self.assets = assets
+        self.anchors: list[str] = []
+        self.links: list[str] = []
+
+    def to_dict(self) -> dict[str, list[str]]:
+        return {"anchors": self.anchors, "links": self.links}
+
+    @classmethod
+    def from_dict(
+        cls, url: str, data: dict[str, list[str]]
+    ) -> "PageLinks":
+        """
+        Restores the record of a page saved with to_dict(), so a page
+        that is not parsed again still has its links checked.
+
+        :param url: The site-absolute URL of the page.
+        :param data: The saved anchors and links.
+        :return: The restored PageLinks.
+        """
+        page = cls(url)
+        page.anchors = list(data.get("anchors", []))
+        page.links = list(data.get("links", []))
+        return page
+
+    def collect(self, node: HTMLNode) -> None:
+        """
+        Records the heading anchors and links of a subtree, rewriting
+        internal href and src attributes to their resolved URLs.
+
+        :param node: A parsed block of the page.
+        """
+        for entering, child in walk(node):
+            if entering and child.props:
+                child.props = self._collect_props(
+                    child.tag, child.props
+                )
+
+    def collect_document(self, document: "FlatDocument") -> None:
+        """
+        Records the heading anchors and links of a flat document,
+        rewriting internal href and src attributes in its attribute
+        table.
+
+        :param document: The parsed page.
+        """
+        names = document.tag_names
+        table = document.props_table
+        for tag_id, props_id in zip(document.tags, document.props_ids):
+            props = table[props_id]
+            if props:
+                table[props_id] = self._collect_props(
+                    names[tag_id], props
+                )
+
+    def _collect_props(
+        self, tag: t.Optional[str], props: dict[str, str | int]
+    ) -> dict[str, str | int]:
+        """
+        Records the anchor and links held by the attributes of one
+        element.
+
+        :return: The attributes, copied with resolved URLs if any link
+            was rewritten.
+        """
+        if tag in _HEADING_TAGS and "id" in props:
+            self.anchors.append(str(props["id"]))
+        for key in _LINK_PROPS:
+            href = props.get(key)
+            if href is None:
+                continue
+            resolved = resolve_link(self.url, str(href))
+            if resolved is None:
+                continue
+            if str(href).startswith("#"):
+                # Same-page fragments are checked but kept as written,
+                # so they stay in-page jumps wherever the page is served.
+                self.links.append(resolved)
+                continue
+            if self.assets:
+                resolved = fingerprinted_url(resolved, self.assets)
+            if resolved != href:
+                props = {**props, key: resolved}
+            self.links.append(resolved)
+        return props
+
+
+class LinkIndex:
+    """
+    A site-wide index of every page, asset and heading anchor.
+
+    Pages and assets are registered by URL, and each page's anchors and
+    links are added as the page is parsed. Every link is then checked
+    with a constant number of set lookups.
+    """
+
+    def __init__(self) -> None:
+        self.targets: set[str] = set()
+        self.anchors: dict[str, set[str]] = {}
+        self.pages: dict[str, list[str]] = {}
+
+    def add_target(self, url: str) -> None:
+        """
+        Registers the URL of a page or asset that the build produces.
+
+        :param url: The site-absolute URL.
+        """
+        self.targets.add(url)
+
+    def add_page(self, page: PageLinks) -> None:
+        """
+        Adds the anchors and links found on a parsed page.
+
+        :param page: The record of the page.
+        """
+        self.targets.add(page.url)
+        self.anchors[page.url] = set(page.anchors)
+        self.pages[page.url] = page.links
+
+    def find_target(self, url: str) -> t.Optional[str]:
+        """
+        Returns the registered URL a link path points at, trying the
+        .html and index.html forms of extension-less paths.
+
+        :param url: The link path, without fragment or query string.
+        :return: The registered URL, or None if nothing is built there.
+        """
+        base = url.rstrip("/")
+        for candidate in (url, f"{base}.html", f"{base}/index.html"):
+            if candidate in self.targets:
+                return candidate
+        return None
+
+    def dead_links(self) -> list[tuple[str, str]]:
+        """
+        Lists the links whose target page, asset or anchor does not
+        exist. Anchors are only checked on pages added with add_page().
+
+        :return: (page URL, link) pairs, in page and link order.
+        """
+        dead = []
+        for page_url in sorted(self.pages):
+            for link in self.pages[page_url]:
+                path, _, fragment = link.partition("#")
+                target = self.find_target(path.split("?", 1)[0])
+                if target is None or (
+                    fragment
+                    and target in self.anchors
+                    and fragment not in self.anchors[target]
+                ):
+                    dead.append((page_url, link))
+        return dead
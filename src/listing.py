@@ -0,0 +1,440 @@
+import json
+import re
+import tempfile
+import typing as t
+from pathlib import Path
+
+from buildio import write_if_changed
+from escaping import escape_text
+from htmlnode import HTMLNode, LeafNode, ParentNode, text_content
+from lazy import truncate_text
+from template import Template
+
+if t.TYPE_CHECKING:
+    from flatdoc import FlatDocument
+
+SEARCH_FORMAT_VERSION = 2
+EXCERPT_LENGTH = 200
+
+_HEADING_TAGS = frozenset(f"h{level}" for level in range(2, 7))
+_TERM = re.compile(r"\w{2,}")
+_SHARD_SAFE = re.compile(r"[^a-z0-9]")
+
+
+class PageRecord:
+    """
+    The compact summary of a page used by listings and search: its URL,
+    title, subheadings, a plain-text excerpt and its distinct terms.
+    """
+
+    __slots__ = (
+        "url",
+        "title",
+        "headings",
+        "excerpt",
+        "excerpt_full",
+        "terms",
+    )
+
+    def __init__(self, url: str) -> None:
+        """
+        Initializes an empty record for a page.
+
+        :param url: The site-absolute URL of the page.
+        """
+        self.url = url
+        self.title: t.Optional[str] = None
+        self.headings: list[str] = []
+        self.excerpt = ""
+        self.excerpt_full = False
+        self.terms: set[str] = set()
+
+    def add_block(self, tag: t.Optional[str], text: str) -> None:
+        """
+        Adds the plain text of one block of the page.
+
+        :param tag: The tag of the block.
+        :param text: The text of the block.
+        """
+        if tag == "h1":
+            if self.title is None:
+                self.title = text
+        elif tag in _HEADING_TAGS:
+            self.headings.append(text)
+        elif not self.excerpt_full:
+            excerpt = f"{self.excerpt} {text}".strip()
+            # A cut excerpt is usually shorter than the limit, so
+            # whether it is full is tracked rather than measured.
+            if len(excerpt) > EXCERPT_LENGTH:
+                excerpt = truncate_text(excerpt, EXCERPT_LENGTH)
+                self.excerpt_full = True
+            elif len(excerpt) == EXCERPT_LENGTH:
+                self.excerpt_full = True
+            self.excerpt = excerpt
+        self.terms.update(_TERM.findall(text.lower()))
+
+    @property
+    def listed(self) -> bool:
+        """
+        Whether the title and the whole excerpt are known, which is all
+        a listing shows of the page.
+        """
+        return self.title is not None and self.excerpt_full
+
+    def collect(self, node: HTMLNode) -> None:
+        """
+        Adds a parsed block of the page.
+
+        :param node: The block.
+        """
+        self.add_block(node.tag, text_content(node))
+
+    def collect_document(self, document: "FlatDocument") -> None:
+        """
+        Adds every block of a parsed page.
+
+        :param document: The page, with one child of the root per block.
+        """
+        for block in document.iter_children(0):
+            self.add_block(
+                document.tag_names[document.tags[block]],
+                document.text_content(block),
+            )
+
+
+class ListingWriter:
+    """
+    Writes paginated listing pages from a stream of page records.
+
+    Only the records of the page being filled are held in memory; a
+    listing page is written as soon as the first record of the next one
+    arrives, so its link to the next page is known.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        url: str,
+        template: Template,
+        page_size: int = 20,
+        title: str = "All pages",
+    ) -> None:
+        """
+        Initializes a ListingWriter.
+
+        :param directory: The directory the listing pages are written to,
+            as 1.html, 2.html and so on.
+        :param url: The URL of that directory.
+        :param template: The layout, filled through its title and content
+            slots.
+        :param page_size: The number of records per listing page.
+        :param title: The title of the listing.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        self.directory = directory
+        self.url = url.rstrip("/")
+        self.template = template
+        self.page_size = page_size
+        self.title = title
+        self.written: list[Path] = []
+        self._records: list[PageRecord] = []
+
+    def add(self, record: PageRecord) -> None:
+        """
+        Adds the next page to the listing.
+
+        :param record: The record of the page.
+        """
+        if len(self._records) == self.page_size:
+            self._write(has_next=True)
+        self._records.append(record)
+
+    def close(self) -> list[Path]:
+        """
+        Writes the last listing page.
+
+        :return: Every listing page written.
+        """
+        if self._records or not self.written:
+            self._write(has_next=False)
+        return self.written
+
+    def _write(self, has_next: bool) -> None:
+        """
+        Writes the held records as the next listing page.
+        """
+        number = len(self.written) + 1
+        items: list[HTMLNode] = []
+        for record in self._records:
+            children: list[HTMLNode] = [
+                LeafNode.trusted(
+                    "a",
+                    record.title or record.url,
+                    {"href": record.url},
+                )
+            ]
+            if record.excerpt:
+                children.append(LeafNode.trusted("p", record.excerpt))
+            items.append(ParentNode.trusted("li", children))
+        body: list[HTMLNode] = [
+            (
+                ParentNode.trusted("ul", items)
+                if items
+                else LeafNode.trusted("p", "Nothing here yet.")
+            )
+        ]
+        navigation: list[HTMLNode] = []
+        if number > 1:
+            navigation.append(
+                LeafNode.trusted(
+                    "a",
+                    "Previous",
+                    {
+                        "href": f"{self.url}/{number - 1}.html",
+                        "rel": "prev",
+                    },
+                )
+            )
+        if has_next:
+            navigation.append(
+                LeafNode.trusted(
+                    "a",
+                    "Next",
+                    {
+                        "href": f"{self.url}/{number + 1}.html",
+                        "rel": "next",
+                    },
+                )
+            )
+        if navigation:
+            body.append(ParentNode.trusted("nav", navigation))
+        title = (
+            self.title
+            if number == 1
+            else f"{self.title}, page {number}"
+        )
+        html = self.template.render(
+            title=escape_text(title),
+            content=ParentNode.trusted("div", body).to_html(),
+        )
+        path = self.directory / f"{number}.html"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_if_changed(path, html.encode("utf-8"))
+        self.written.append(path)
+        self._records = []
+
+
+def shard_name(term: str, prefix: int = 1) -> str:
+    """
+    Returns the name of the search shard holding a term.
+
+    :param term: The lowercase term.
+    :param prefix: The number of leading characters shards are split by.
+    :return: The shard name; characters other than a-z and 0-9 become _.
+    """
+    return _SHARD_SAFE.sub("_", term[:prefix])
+
+
+class SearchIndexWriter:
+    """
+    Writes a sharded inverted index from a stream of page records.
+
+    Documents are numbered in the order they are added and written in
+    fixed-size chunks (docs-N.json). Postings are kept in memory only up
+    to max_postings and are then spilled to one temporary file per
+    shard, named after the first shard_prefix characters of its terms.
+    When the index is closed, a shard holding more than
+    max_shard_postings postings is split by one more character of its
+    terms, repeatedly, so shards stay bounded as the site grows. Each
+    shard is then merged on its own and written as terms-<shard>.json,
+    mapping each term to its document numbers.
+
+    meta.json tells the client the chunk size and the shard names, which
+    have different lengths once shards are split: a term is in the
+    shard with the longest name that the term, as returned by
+    shard_name(term, len(term)), starts with. A query only loads the
+    shard of its terms and the chunks of the documents it matches.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        docs_per_chunk: int = 500,
+        max_postings: int = 100_000,
+        shard_prefix: int = 1,
+        max_shard_postings: int = 50_000,
+    ) -> None:
+        """
+        Initializes a SearchIndexWriter.
+
+        :param directory: The directory the index is written to.
+        :param docs_per_chunk: The number of documents per docs file.
+        :param max_postings: The number of postings held in memory
+            before they are spilled to disk.
+        :param shard_prefix: The number of leading characters of a term
+            that select its shard before shards are split.
+        :param max_shard_postings: The number of postings above which a
+            shard is split.
+        """
+        self.directory = directory
+        self.docs_per_chunk = docs_per_chunk
+        self.max_postings = max_postings
+        self.shard_prefix = shard_prefix
+        self.max_shard_postings = max_shard_postings
+        self.written: list[Path] = []
+        self._documents = 0
+        self._chunks = 0
+        self._docs: list[list[str]] = []
+        self._postings: dict[str, list[int]] = {}
+        self._pending = 0
+        self._spill = tempfile.TemporaryDirectory(prefix="search-")
+        self._shards: dict[str, int] = {}
+
+    def add(self, record: PageRecord) -> None:
+        """
+        Adds the next page to the index.
+
+        :param record: The record of the page.
+        """
+        number = self._documents
+        self._documents += 1
+        self._docs.append(
+            [record.url, record.title or "", record.excerpt]
+        )
+        if len(self._docs) == self.docs_per_chunk:
+            self._write_docs()
+        for term in record.terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                self._postings[term] = [number]
+            else:
+                postings.append(number)
+        self._pending += len(record.terms)
+        if self._pending >= self.max_postings:
+            self._spill_postings()
+
+    def close(self) -> list[Path]:
+        """
+        Merges the spilled postings shard by shard and writes the index.
+
+        :return: Every file of the index.
+        """
+        try:
+            if self._docs or not self._documents:
+                self._write_docs()
+            self._spill_postings()
+            pending = sorted(self._shards, reverse=True)
+            shards = []
+            while pending:
+                shard = pending.pop()
+                if self._shards[shard] > self.max_shard_postings:
+                    pieces = self._split_shard(shard)
+                    if pieces != [shard]:
+                        pending.extend(reversed(pieces))
+                        continue
+                self._write_shard(shard)
+                shards.append(shard)
+            self._write_json(
+                "meta.json",
+                {
+                    "version": SEARCH_FORMAT_VERSION,
+                    "documents": self._documents,
+                    "docs_per_chunk": self.docs_per_chunk,
+                    "shard_prefix": self.shard_prefix,
+                    "shards": sorted(shards),
+                },
+            )
+        finally:
+            self._spill.cleanup()
+        return self.written
+
+    def _spill_path(self, shard: str) -> Path:
+        return Path(self._spill.name) / f"{shard}.tsv"
+
+    def _spill_postings(self) -> None:
+        """
+        Appends the postings held in memory to their shards' files.
+        """
+        by_shard: dict[str, list[str]] = {}
+        for term, numbers in self._postings.items():
+            shard = shard_name(term, self.shard_prefix)
+            by_shard.setdefault(shard, []).append(
+                f"{term}\t{' '.join(map(str, numbers))}\n"
+            )
+            self._shards[shard] = self._shards.get(shard, 0) + len(
+                numbers
+            )
+        for shard, lines in by_shard.items():
+            with open(
+                self._spill_path(shard), "a", encoding="utf-8"
+            ) as fp:
+                fp.writelines(lines)
+        self._postings = {}
+        self._pending = 0
+
+    def _split_shard(self, shard: str) -> list[str]:
+        """
+        Splits a spilled shard by one more character of its terms,
+        streaming its file into one file per piece. Terms no longer than
+        the shard name stay in a piece of the same name.
+
+        :return: The names of the pieces.
+        """
+        source = Path(self._spill.name) / f"{shard}.split"
+        self._spill_path(shard).rename(source)
+        del self._shards[shard]
+        length = len(shard) + 1
+        files: dict[str, t.TextIO] = {}
+        try:
+            with open(source, encoding="utf-8") as fp:
+                for line in fp:
+                    term, _, numbers = line.partition("\t")
+                    piece = shard_name(term, length)
+                    out = files.get(piece)
+                    if out is None:
+                        out = files[piece] = open(
+                            self._spill_path(piece),
+                            "w",
+                            encoding="utf-8",
+                        )
+                    out.write(line)
+                    count = len(numbers.split())
+                    self._shards[piece] = (
+                        self._shards.get(piece, 0) + count
+                    )
+        finally:
+            for out in files.values():
+                out.close()
+        source.unlink()
+        return sorted(files)
+
+    def _write_shard(self, shard: str) -> None:
+        """
+        Merges the postings of a spilled shard and writes it.
+        """
+        terms: dict[str, list[int]] = {}
+        with open(self._spill_path(shard), encoding="utf-8") as fp:
+            for line in fp:
+                term, _, numbers = line.rstrip("\n").partition("\t")
+                terms.setdefault(term, []).extend(
+                    int(number) for number in numbers.split()
+                )
+        self._write_json(f"terms-{shard}.json", terms)
+
+    def _write_docs(self) -> None:
+        """
+        Writes the held documents as the next chunk.
+        """
+        self._write_json(f"docs-{self._chunks}.json", self._docs)
+        self._chunks += 1
+        self._docs = []
+
+    def _write_json(self, name: str, data: object) -> None:
+        path = self.directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        encoded = json.dumps(
+            data, separators=(",", ":"), sort_keys=True
+        )
+        write_if_changed(path, encoded.encode("utf-8"))
+        self.written.append(path)
@@ -1,8 +1,238 @@
-from textnode import TextNode, TextType
+import argparse
+import sys
+import typing as t
+from pathlib import Path
 
+if t.TYPE_CHECKING:
+    from profiling import Profiler
 
-text = "Anything"
-textType = TextType.LINK
-url = "Any"
+# Subcommands import the modules they need when they run, so that
+# starting the CLI, e.g. to rebuild one page from an editor hook, only
+# loads what that command uses.
+COMMANDS = ("build", "serve", "page")
 
-print(TextNode(text, textType, url))
+
+def positive_int(value: str) -> int:
+    """
+    Parses a command-line value that must be a whole number above zero.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"must be a positive integer: {value!r}"
+        )
+    return number
+
+
+def parse_args(
+    argv: t.Optional[t.Sequence[str]] = None,
+) -> argparse.Namespace:
+    """
+    Parses the command line. Without a subcommand, the site is built.
+
+    :param argv: The arguments, or None for sys.argv[1:].
+    :return: The parsed arguments.
+    """
+    args = list(sys.argv[1:] if argv is None else argv)
+    if not args or args[0] not in (*COMMANDS, "-h", "--help"):
+        args.insert(0, "build")
+
+    sources = argparse.ArgumentParser(add_help=False)
+    sources.add_argument(
+        "--content", type=Path, default=Path("content")
+    )
+    sources.add_argument(
+        "--template", type=Path, default=Path("template.html")
+    )
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--output", type=Path, default=Path("public"))
+    output.add_argument(
+        "--cache",
+        type=Path,
+        help="cache parsed pages in this directory, keyed by source hash",
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Generate a static site from Markdown content."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser(
+        "build",
+        parents=[sources, output],
+        help="build the site (default)",
+    )
+    build.add_argument("--static", type=Path, default=Path("static"))
+    build.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild outputs whose inputs changed",
+    )
+    build.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of processes rendering pages in parallel",
+    )
+    build.add_argument(
+        "--profile",
+        type=Path,
+        help="write per-stage and per-page timings to this JSON file",
+    )
+    build.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="add content hashes to asset names and rewrite links to them",
+    )
+    build.add_argument(
+        "--minify",
+        action="store_true",
+        help="minify stylesheets, HTML assets and the layout",
+    )
+    build.add_argument(
+        "--listing",
+        type=positive_int,
+        metavar="N",
+        help="write listing pages of N pages each to list/",
+    )
+    build.add_argument(
+        "--search",
+        action="store_true",
+        help="write a sharded search index to search/",
+    )
+
+    serve = commands.add_parser(
+        "serve",
+        parents=[sources],
+        help="serve the site with live rebuilds",
+    )
+    serve.add_argument("--static", type=Path, default=Path("static"))
+    serve.add_argument("--host", default="localhost")
+    serve.add_argument("--port", type=int, default=8000)
+
+    page = commands.add_parser(
+        "page",
+        parents=[sources, output],
+        help="render single pages, without building the rest of the site",
+    )
+    page.add_argument(
+        "sources",
+        type=Path,
+        nargs="+",
+        help="the Markdown files to render",
+    )
+    return parser.parse_args(args)
+
+
+def run_build(
+    args: argparse.Namespace, template: t.Optional[Path]
+) -> None:
+    """
+    Builds the whole site.
+    """
+    from build import build_site
+
+    profiler: t.Optional["Profiler"] = None
+    if args.profile is not None:
+        from profiling import Profiler
+
+        profiler = Profiler()
+    result = build_site(
+        args.content,
+        args.output,
+        args.static,
+        incremental=args.incremental,
+        jobs=args.jobs,
+        template_path=template,
+        profiler=profiler,
+        cache_dir=args.cache,
+        fingerprint=args.fingerprint,
+        minify=args.minify,
+        listing_page_size=args.listing,
+        search_index=args.search,
+    )
+    if profiler is not None:
+        profiler.write(args.profile)
+    print(
+        f"built {len(result.built)}, skipped {len(result.skipped)}, "
+        f"removed {len(result.removed)}"
+    )
+    for page, link in result.dead_links:
+        print(f"dead link on {page}: {link}")
+    if result.dead_links:
+        sys.exit(1)
+
+
+def run_serve(
+    args: argparse.Namespace, template: t.Optional[Path]
+) -> None:
+    """
+    Serves the site from memory.
+    """
+    import asyncio
+
+    from server import DevServer
+
+    server = DevServer(args.content, args.static, template)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+def run_page(
+    args: argparse.Namespace, template: t.Optional[Path]
+) -> None:
+    """
+    Renders the given pages to the paths a build would write them to.
+
+    Pages are rendered with the fingerprinted asset names and layout
+    minification of the last build of the output directory. Links are
+    rewritten as in a build, but they are not checked, since that needs
+    every page of the site.
+    """
+    from build import (
+        Manifest,
+        default_manifest_path,
+        output_name,
+        write_page,
+    )
+
+    options = Manifest.load(default_manifest_path(args.output)).options
+
+    for source in args.sources:
+        try:
+            name = output_name(source.resolve(), args.content.resolve())
+        except ValueError:
+            sys.exit(f"{source} is not in {args.content}")
+        output = args.output / name
+        output.parent.mkdir(parents=True, exist_ok=True)
+        write_page(
+            source,
+            output,
+            "/" + name.as_posix(),
+            template,
+            cache_dir=args.cache,
+            assets=options.get("assets"),
+            minify=bool(options.get("minify")),
+        )
+        print(f"wrote {output}")
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    template = args.template if args.template.exists() else None
+    if args.command == "serve":
+        run_serve(args, template)
+    elif args.command == "page":
+        run_page(args, template)
+    else:
+        run_build(args, template)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import contextlib
+import json
+import time
+import typing as t
+from pathlib import Path
+
+Hook = t.Callable[[str, str, t.Optional[str]], None]
+
+
+class Profiler:
+    """
+    Collects per-stage timings and counters for a build.
+
+    Timings and counters are kept both for the whole build and per page.
+    Hooks are called with ("start" | "end", stage, page) around every
+    timed stage, so external profilers can attach markers or toggle
+    sampling for the stages they care about.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self.pages: dict[str, dict[str, dict[str, float]]] = {}
+        self._hooks: list[Hook] = []
+
+    def add_hook(self, hook: Hook) -> None:
+        """
+        Registers a callable invoked when a stage starts and ends.
+
+        :param hook: Called with the event, the stage and the page.
+        """
+        self._hooks.append(hook)
+
+    def _page(self, page: str) -> dict[str, dict[str, float]]:
+        entry = self.pages.get(page)
+        if entry is None:
+            entry = self.pages[page] = {"stages": {}, "counters": {}}
+        return entry
+
+    def add_time(
+        self, stage: str, seconds: float, page: t.Optional[str] = None
+    ) -> None:
+        """
+        Adds elapsed time to a stage.
+
+        :param stage: The stage name.
+        :param seconds: The time spent.
+        :param page: The page the time is attributed to, if any.
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        if page is not None:
+            stages = self._page(page)["stages"]
+            stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def count(
+        self,
+        counter: str,
+        amount: int = 1,
+        page: t.Optional[str] = None,
+    ) -> None:
+        """
+        Increments a counter.
+
+        :param counter: The counter name.
+        :param amount: The amount to add.
+        :param page: The page the amount is attributed to, if any.
+        """
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+        if page is not None:
+            counters = self._page(page)["counters"]
+            counters[counter] = counters.get(counter, 0) + amount
+
+    @contextlib.contextmanager
+    def stage(
+        self, stage: str, page: t.Optional[str] = None
+    ) -> t.Iterator[None]:
+        """
+        Times the enclosed block as one run of a stage.
+
+        :param stage: The stage name.
+        :param page: The page the time is attributed to, if any.
+        """
+        for hook in self._hooks:
+            hook("start", stage, page)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start, page)
+            for hook in self._hooks:
+                hook("end", stage, page)
+
+    def timed_iter(
+        self,
+        stage: str,
+        iterable: t.Iterable[t.Any],
+        page: t.Optional[str] = None,
+    ) -> t.Iterator[t.Any]:
+        """
+        Wraps an iterator, attributing the time spent producing each item
+        to a stage. Useful for lazy stages such as streaming parsers.
+
+        :param stage: The stage name.
+        :param iterable: The iterable to wrap.
+        :param page: The page the time is attributed to, if any.
+        :return: An iterator over the same items.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(stage, page):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def report(self) -> dict[str, t.Any]:
+        """
+        Returns the collected data as a JSON-serializable dictionary.
+        """
+        return {
+            "stages": dict(self.stages),
+            "counters": dict(self.counters),
+            "pages": self.pages,
+        }
+
+    def merge(self, report: dict[str, t.Any]) -> None:
+        """
+        Adds a report from another Profiler, e.g. one from a worker
+        process, to this one.
+
+        :param report: A dictionary returned by Profiler.report().
+        """
+        for stage, seconds in report["stages"].items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        for counter, amount in report["counters"].items():
+            self.counters[counter] = (
+                self.counters.get(counter, 0) + amount
+            )
+        for page, data in report["pages"].items():
+            for stage, seconds in data["stages"].items():
+                stages = self._page(page)["stages"]
+                stages[stage] = stages.get(stage, 0.0) + seconds
+            for counter, amount in data["counters"].items():
+                counters = self._page(page)["counters"]
+                counters[counter] = counters.get(counter, 0) + amount
+
+    def write(self, path: Path) -> None:
+        """
+        Writes the report as JSON.
+
+        :param path: The file to write.
+        """
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(self.report(), fp, indent=2, sort_keys=True)
@@ -0,0 +1,268 @@
+import asyncio
+import itertools
+import mimetypes
+import stat
+import sys
+import typing as t
+from pathlib import Path
+
+from build import get_template, output_name, render_page
+from escaping import escape_text
+from linkindex import PageLinks
+from template import Template
+
+_STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+}
+
+
+class DevServer:
+    """
+    A development server that keeps the rendered site in memory.
+
+    Every page and static asset is held in memory and served over HTTP
+    from an asyncio server. Sources are polled for changes, and only the
+    pages whose source changed are re-rendered; a changed layout
+    re-renders every page. A file that cannot be rendered or read is
+    logged and served as an error page until it changes again.
+    """
+
+    def __init__(
+        self,
+        content_dir: Path,
+        static_dir: t.Optional[Path] = None,
+        template_path: t.Optional[Path] = None,
+        poll_interval: float = 0.1,
+    ) -> None:
+        """
+        Initializes a DevServer and renders the whole site.
+
+        :param content_dir: The directory holding the Markdown sources.
+        :param static_dir: An optional directory of static assets.
+        :param template_path: An optional layout file for every page.
+        :param poll_interval: Seconds between checks for changed files.
+        """
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.poll_interval = poll_interval
+        self.files: dict[str, bytes] = {}
+        self.errors: set[str] = set()
+        self._sources: dict[Path, tuple[int, int]] = {}
+        self._template_state: t.Optional[tuple[int, int]] = None
+        self._template: Template = get_template(None)
+        self._template_error: t.Optional[str] = None
+        self.check_changes()
+
+    def check_changes(self) -> list[str]:
+        """
+        Re-renders pages and reloads assets whose files were added,
+        changed or removed since the last check.
+
+        :return: The URL paths that were updated or removed.
+        """
+        rerender_all = False
+        if self.template_path is not None:
+            state = _file_state(self.template_path)
+            if state != self._template_state:
+                self._template_state = state
+                rerender_all = True
+                try:
+                    self._template = Template.compile(
+                        self.template_path.read_text(encoding="utf-8")
+                    )
+                except (OSError, ValueError) as error:
+                    self._template_error = (
+                        f"{self.template_path}: {error}"
+                    )
+                    _log_error(self._template_error)
+                else:
+                    self._template_error = None
+
+        current: dict[Path, tuple[int, int]] = {}
+        sources: t.Iterable[Path] = self.content_dir.rglob("*.md")
+        if self.static_dir is not None and self.static_dir.is_dir():
+            sources = itertools.chain(
+                sources, self.static_dir.rglob("*")
+            )
+        for source in sources:
+            # Files may vanish between listing and stat, e.g. during an
+            # editor's atomic save; they are picked up on the next poll.
+            state = _file_state(source)
+            if state is not None:
+                current[source] = state
+
+        updated = []
+        for source, state in current.items():
+            is_page = source.suffix == ".md" and source.is_relative_to(
+                self.content_dir
+            )
+            if self._sources.get(source) == state and not (
+                rerender_all and is_page
+            ):
+                continue
+            url = self._url(source)
+            try:
+                self.files[url] = self._load(source, url, is_page)
+            except Exception as error:
+                message = f"{source}: {error!r}"
+                _log_error(message)
+                self.files[url] = _error_page(message)
+                self.errors.add(url)
+            else:
+                self.errors.discard(url)
+            updated.append(url)
+        for source in self._sources.keys() - current.keys():
+            url = self._url(source)
+            self.files.pop(url, None)
+            self.errors.discard(url)
+            updated.append(url)
+        self._sources = current
+        return sorted(updated)
+
+    def _load(self, source: Path, url: str, is_page: bool) -> bytes:
+        """
+        Renders a page or reads an asset.
+        """
+        if not is_page:
+            return source.read_bytes()
+        if self._template_error is not None:
+            raise ValueError(f"invalid layout {self._template_error}")
+        html = render_page(source, self._template, links=PageLinks(url))
+        return html.encode("utf-8")
+
+    def _url(self, source: Path) -> str:
+        """
+        Returns the URL path a source file is served at.
+        """
+        if source.suffix == ".md" and source.is_relative_to(
+            self.content_dir
+        ):
+            name = output_name(source, self.content_dir)
+        else:
+            assert self.static_dir is not None
+            name = source.relative_to(self.static_dir)
+        return "/" + name.as_posix()
+
+    def lookup(self, path: str) -> t.Optional[tuple[str, bytes]]:
+        """
+        Finds the file served for a URL path, trying path.html and
+        path/index.html for extension-less paths.
+
+        :param path: The URL path, without query string.
+        :return: The matched path and its contents, or None if nothing
+            is served there.
+        """
+        path = path.rstrip("/")
+        for candidate in (path, f"{path}.html", f"{path}/index.html"):
+            body = self.files.get(candidate)
+            if body is not None:
+                return candidate, body
+        return None
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Serves a single HTTP request from memory and closes the
+        connection.
+        """
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (
+                b"\r\n",
+                b"\n",
+                b"",
+            ):
+                pass
+            parts = request_line.decode("latin-1").split()
+            status, body, content_type = 404, b"", "text/plain"
+            if len(parts) < 2 or parts[0] not in ("GET", "HEAD"):
+                status = 400
+            else:
+                found = self.lookup(parts[1].split("?", 1)[0])
+                if found is not None:
+                    status, body = 200, found[1]
+                    if found[0] in self.errors:
+                        status = 500
+                    content_type = (
+                        mimetypes.guess_type(found[0])[0]
+                        or "application/octet-stream"
+                    )
+            head = (
+                f"HTTP/1.1 {status} {_STATUS_TEXT[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Cache-Control: no-store\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            writer.write(head.encode("latin-1"))
+            if parts[:1] != ["HEAD"]:
+                writer.write(body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def watch(self) -> None:
+        """
+        Polls the sources forever, re-rendering whatever changed.
+
+        Checks run in a worker thread, so requests are served while the
+        site is scanned and rendered, and a failed check is logged and
+        retried on the next poll.
+        """
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                updated = await asyncio.to_thread(self.check_changes)
+            except Exception as error:
+                _log_error(f"checking for changes failed: {error!r}")
+                continue
+            for url in updated:
+                print(f"updated {url}")
+
+    async def serve(
+        self, host: str = "localhost", port: int = 8000
+    ) -> None:
+        """
+        Serves the site and watches for changes until cancelled.
+
+        :param host: The interface to listen on.
+        :param port: The port to listen on.
+        """
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"serving on http://{host}:{port}/")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.watch())
+
+
+def _file_state(path: Path) -> t.Optional[tuple[int, int]]:
+    """
+    Returns the modification time and size used to detect changes, or
+    None if the path is not a readable file.
+    """
+    try:
+        info = path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(info.st_mode):
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+def _error_page(message: str) -> bytes:
+    """
+    Returns the page served in place of a file that failed to render.
+    """
+    return (
+        "<html><head><title>Build error</title></head><body>"
+        f"<h1>Build error</h1><pre>{escape_text(message)}</pre>"
+        "</body></html>"
+    ).encode("utf-8")
+
+
+def _log_error(message: str) -> None:
+    print(f"error: {message}", file=sys.stderr)
@@ -0,0 +1,113 @@
+import functools
+import re
+import typing as t
+from pathlib import Path
+
+_SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    """
+    A page layout compiled into static chunks and named slots.
+
+    The layout source is parsed once; rendering a page only joins the
+    static chunks with the values given for the slots. Slots are written
+    as {{ name }} in the layout.
+    """
+
+    __slots__ = ("chunks", "slots")
+
+    def __init__(self, chunks: list[str], slots: list[str]) -> None:
+        """
+        Initializes a Template from its compiled parts.
+
+        :param chunks: The static text around the slots; there is always
+            one more chunk than there are slots.
+        :param slots: The slot names, in order of appearance.
+        """
+        if len(chunks) != len(slots) + 1:
+            raise ValueError(
+                "chunks must have one more item than slots"
+            )
+        self.chunks = chunks
+        self.slots = slots
+
+    @classmethod
+    def compile(cls, source: str) -> "Template":
+        """
+        Compiles a layout source into a Template.
+
+        :param source: The layout, with {{ name }} slots.
+        :return: The compiled Template.
+        """
+        parts = _SLOT_PATTERN.split(source)
+        return cls(parts[::2], parts[1::2])
+
+    @property
+    def source(self) -> str:
+        """
+        The layout source, with every slot written as {{ name }}.
+        """
+        parts = [self.chunks[0]]
+        for slot, chunk in zip(self.slots, self.chunks[1:]):
+            parts.append(f"{{{{ {slot} }}}}")
+            parts.append(chunk)
+        return "".join(parts)
+
+    def transform(self, func: t.Callable[[str], str]) -> "Template":
+        """
+        Compiles a new Template from this layout's source after passing
+        it through a function, such as a minifier. The function must
+        keep the {{ name }} slots.
+
+        :param func: Called with the layout source.
+        :return: The compiled Template.
+        """
+        return self.compile(func(self.source))
+
+    def iter_render(self, **values: str) -> t.Iterator[str]:
+        """
+        Yields the rendered layout as fragments.
+
+        :param values: The text of every slot, by name.
+        :return: An iterator over the static chunks and slot values.
+        """
+        missing = set(self.slots) - values.keys()
+        if missing:
+            raise ValueError(
+                f"missing template slots: {sorted(missing)}"
+            )
+        chunks = self.chunks
+        yield chunks[0]
+        for index, slot in enumerate(self.slots, 1):
+            yield values[slot]
+            yield chunks[index]
+
+    def render(self, **values: str) -> str:
+        """
+        Renders the layout with the given slot values.
+
+        :param values: The text of every slot, by name.
+        :return: The rendered page.
+        """
+        return "".join(self.iter_render(**values))
+
+    def write(self, fp: t.TextIO, **values: str) -> None:
+        """
+        Writes the rendered layout to a text stream.
+
+        :param fp: A writable text stream, such as an open file.
+        :param values: The text of every slot, by name.
+        """
+        fp.writelines(self.iter_render(**values))
+
+
+@functools.lru_cache(maxsize=None)
+def load_template(path: Path) -> Template:
+    """
+    Reads and compiles a layout file, once per path and process.
+
+    :param path: The layout file.
+    :return: The compiled Template.
+    """
+    return Template.compile(path.read_text(encoding="utf-8"))
@@ -0,0 +1,150 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from assets import (
+    fingerprint_name,
+    minify_css,
+    minify_html,
+    process_asset,
+    rewrite_asset_urls,
+    rewrite_css_urls,
+    should_fingerprint,
+)
+from linkindex import fingerprinted_url
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_fingerprint_name(self) -> None:
+        self.assertEqual(
+            fingerprint_name("css/site.css", "0123456789abcdef"),
+            "css/site.0123456789.css",
+        )
+
+    def test_should_fingerprint(self) -> None:
+        self.assertTrue(should_fingerprint("img/Logo.PNG"))
+        self.assertFalse(should_fingerprint("robots.txt"))
+        self.assertFalse(should_fingerprint("404.html"))
+
+    def test_fingerprinted_url(self) -> None:
+        assets = {"/site.css": "/site.abc.css"}
+        self.assertEqual(
+            fingerprinted_url("/site.css?v=1#x", assets),
+            "/site.abc.css?v=1#x",
+        )
+        self.assertEqual(
+            fingerprinted_url("/other.css", assets), "/other.css"
+        )
+
+    def test_rewrite_asset_urls(self) -> None:
+        assets = {
+            "/site.css": "/site.abc.css",
+            "/app.js": "/app.def.js",
+        }
+        self.assertEqual(
+            rewrite_asset_urls(
+                "<link href=\"/site.css\"><script src='/app.js'></script>"
+                '<a href="site.css">',
+                assets,
+            ),
+            "<link href=\"/site.abc.css\"><script src='/app.def.js'>"
+            '</script><a href="site.css">',
+        )
+
+    def test_rewrite_css_urls(self) -> None:
+        assets = {
+            "/fonts/a.woff2": "/fonts/a.123.woff2",
+            "/img/bg.png": "/img/bg.456.png",
+        }
+        css = (
+            "@font-face{src:url('../fonts/a.woff2?v=2#f')}"
+            "body{background:url( /img/bg.png )}"
+            'p{background:url("data:image/png;base64,AA")}'
+            "q{background:url(other.png)}"
+        )
+        self.assertEqual(
+            rewrite_css_urls(css, "/css/site.css", assets),
+            "@font-face{src:url('../fonts/a.123.woff2?v=2#f')}"
+            "body{background:url( /img/bg.456.png )}"
+            'p{background:url("data:image/png;base64,AA")}'
+            "q{background:url(other.png)}",
+        )
+
+
+class TestMinify(unittest.TestCase):
+
+    def test_minify_css(self) -> None:
+        css = """
+/* comment */
+body  {
+  color : red ;
+  font-family: "A  B", sans-serif;
+}
+a > b { margin: 0 auto; }
+"""
+        self.assertEqual(
+            minify_css(css),
+            'body{color:red;font-family:"A  B",sans-serif}a>b{margin:0 auto}',
+        )
+
+    def test_minify_css_keeps_descendant_pseudo_classes(self) -> None:
+        self.assertEqual(
+            minify_css(".nav :hover { color : red }\na:hover{x: y}"),
+            ".nav :hover{color:red}a:hover{x:y}",
+        )
+
+    def test_minify_html(self) -> None:
+        html = """<html>
+  <!-- comment -->
+  <body>
+    <p>Some   text</p>
+    <pre>  keep
+   this </pre>
+  </body>
+</html>
+"""
+        self.assertEqual(
+            minify_html(html),
+            "<html> <body> <p>Some text</p> <pre>  keep\n   this </pre>"
+            " </body> </html>",
+        )
+
+    def test_minify_html_keeps_space_between_inline_elements(
+        self,
+    ) -> None:
+        self.assertEqual(
+            minify_html("<p><a>one</a>\n   <b>two</b></p>"),
+            "<p><a>one</a> <b>two</b></p>",
+        )
+
+    def test_process_asset(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            source = root / "site.css"
+            source.write_text("a { color: red; }")
+            output = root / "out.css"
+            self.assertTrue(process_asset(source, output, minify=True))
+            self.assertEqual(output.read_text(), "a{color:red}")
+            self.assertFalse(process_asset(source, output, minify=True))
+            self.assertTrue(process_asset(source, output))
+            self.assertEqual(output.read_text(), "a { color: red; }")
+
+    def test_process_html_asset(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            source = root / "about.html"
+            source.write_text('<img src="/a.png"> <a href="b.png">')
+            output = root / "out.html"
+            assets = {"/a.png": "/a.0123456789.png"}
+            process_asset(
+                source, output, url="/about.html", assets=assets
+            )
+            self.assertEqual(
+                output.read_text(),
+                '<img src="/a.0123456789.png"> <a href="b.png">',
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import tempfile
+import typing as t
+import unittest
+from pathlib import Path
+
+from astcache import ASTCache, cache_key
+from flatdoc import FlatDocument, markdown_to_document
+from htmlnode import leaf_factory, register_inline_type
+from textnode import TextType
+from utils import register_delimiter
+
+
+class TestASTCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ASTCache(Path(self.tmp.name) / "cache")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_put_and_get(self) -> None:
+        key = cache_key("abc", heading_ids=True)
+        self.assertIsNone(self.cache.get(key))
+        document = markdown_to_document("# Title\n\nText")
+        self.assertTrue(self.cache.put(key, document))
+        self.assertEqual(self.cache.get(key), document)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_keys_differ_by_variant(self) -> None:
+        self.assertNotEqual(
+            cache_key("abc", heading_ids=True),
+            cache_key("abc", heading_ids=False),
+        )
+
+    def test_keys_differ_by_inline_extensions(self) -> None:
+        key = cache_key("abc", heading_ids=True)
+        try:
+            register_inline_type(
+                TextType.STRIKETHROUGH, leaf_factory("del")
+            )
+            self.assertNotEqual(cache_key("abc", heading_ids=True), key)
+        finally:
+            register_inline_type(
+                TextType.STRIKETHROUGH, leaf_factory("s")
+            )
+        self.assertEqual(cache_key("abc", heading_ids=True), key)
+        try:
+            register_delimiter("~~", TextType.CODE)
+            self.assertNotEqual(cache_key("abc", heading_ids=True), key)
+        finally:
+            register_delimiter("~~", TextType.STRIKETHROUGH)
+        self.assertEqual(cache_key("abc", heading_ids=True), key)
+
+    def test_corrupt_file_is_a_miss(self) -> None:
+        key = cache_key("abc", heading_ids=False)
+        self.cache.path(key).write_bytes(b"garbage")
+        self.assertIsNone(self.cache.get(key))
+        document = markdown_to_document("# Title\n\nText")
+        document.parents[2] = 7
+        self.cache.path(key).write_bytes(document.to_bytes())
+        self.assertIsNone(self.cache.get(key))
+
+    def test_unserializable_props_are_not_cached(self) -> None:
+        document = FlatDocument()
+        props: dict[str, t.Any] = {"data": object()}
+        document.add_leaf("p", "text", props)
+        key = cache_key("abc", heading_ids=False)
+        self.assertFalse(self.cache.put(key, document))
+        self.assertFalse(self.cache.path(key).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
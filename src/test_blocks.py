@@ -0,0 +1,101 @@
+import io
+import typing as t
+import unittest
+
+from blocks import iter_blocks, markdown_to_html_node
+from htmlnode import LeafNode, ParentNode
+
+
+class TestIterBlocks(unittest.TestCase):
+
+    def test_paragraphs(self) -> None:
+        node = markdown_to_html_node(
+            "This is **bolded** paragraph\ntext in a p\n\n"
+            "Another _italic_ paragraph"
+        )
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>This is <b>bolded</b> paragraph text in a p</p>"
+            "<p>Another <i>italic</i> paragraph</p></div>",
+        )
+
+    def test_headings(self) -> None:
+        node = markdown_to_html_node("# One\n### Three\n####### Seven")
+        self.assertEqual(
+            node.to_html(),
+            "<div><h1>One</h1><h3>Three</h3><p>####### Seven</p></div>",
+        )
+
+    def test_heading_ids(self) -> None:
+        blocks = iter_blocks(
+            ["# Hello, World!", "## Hello World", "text", "# `x` y"],
+            heading_ids=True,
+        )
+        self.assertEqual(
+            [block.props for block in blocks],
+            [
+                {"id": "hello-world"},
+                {"id": "hello-world-1"},
+                None,
+                {"id": "x-y"},
+            ],
+        )
+
+    def test_code_block_is_not_parsed(self) -> None:
+        node = markdown_to_html_node(
+            "```\nThis is text that _should_ remain\n\nthe **same**\n```"
+        )
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code>This is text that _should_ remain\n\n"
+            "the **same**\n</code></pre></div>",
+        )
+
+    def test_lists_and_quotes(self) -> None:
+        node = markdown_to_html_node(
+            "- one\n* two\n1. first\n2. second\n> quoted\n> text"
+        )
+        self.assertEqual(
+            node.to_html(),
+            "<div><ul><li>one</li><li>two</li></ul>"
+            "<ol><li>first</li><li>second</li></ol>"
+            "<blockquote>quoted text</blockquote></div>",
+        )
+
+    def test_empty_heading(self) -> None:
+        node = markdown_to_html_node("#")
+        self.assertEqual(node.to_html(), "<div><p>#</p></div>")
+        node = markdown_to_html_node("# ")
+        self.assertEqual(node.to_html(), "<div><h1></h1></div>")
+
+    def test_empty_document(self) -> None:
+        node = markdown_to_html_node("")
+        self.assertEqual(node.to_html(), "<div></div>")
+
+    def test_streams_blocks(self) -> None:
+        lines_read: list[str] = []
+
+        def lines() -> t.Iterator[str]:
+            for line in ["# Title\n", "\n", "text\n", "\n", "more\n"]:
+                lines_read.append(line)
+                yield line
+
+        blocks = iter_blocks(lines())
+        self.assertEqual(
+            next(blocks), ParentNode("h1", [LeafNode(None, "Title")])
+        )
+        self.assertEqual(len(lines_read), 1)
+        self.assertEqual(
+            next(blocks), ParentNode("p", [LeafNode(None, "text")])
+        )
+        self.assertEqual(len(lines_read), 4)
+
+    def test_reads_file_objects(self) -> None:
+        source = io.StringIO("# Title\r\n\r\ntext\r\n")
+        self.assertEqual(
+            [block.tag for block in iter_blocks(source)], ["h1", "p"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
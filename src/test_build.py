@@ -0,0 +1,394 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from build import (
+    BuildResult,
+    Manifest,
+    build_site,
+    default_manifest_path,
+    render_page,
+    summarize_page,
+)
+from profiling import Profiler
+from template import load_template
+
+
+class TestRenderPage(unittest.TestCase):
+
+    def test_render_page(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "page.md"
+            source.write_text("Intro\n\n# The **Title**\n\n- item\n")
+            page = render_page(source)
+        self.assertIn("<title>The Title</title>", page)
+        self.assertIn(
+            "<div><p>Intro</p><h1>The <b>Title</b></h1>"
+            "<ul><li>item</li></ul></div>",
+            page,
+        )
+
+    def test_title_falls_back_to_file_name(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "notes.md"
+            source.write_text("## Sub\n")
+            self.assertIn("<title>notes</title>", render_page(source))
+
+
+class TestSummarizePage(unittest.TestCase):
+
+    def test_stops_after_excerpt_without_terms(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "page.md"
+            source.write_text(
+                "# Title\n\n" + "word " * 100 + "\n\nlate text\n"
+            )
+            listed = summarize_page(source, "/page.html", terms=False)
+            full = summarize_page(source, "/page.html")
+        self.assertEqual(listed.title, "Title")
+        self.assertEqual(listed.excerpt, full.excerpt)
+        self.assertNotIn("late", listed.terms)
+        self.assertIn("late", full.terms)
+
+
+class TestBuildSite(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / "content"
+        self.static = self.root / "static"
+        self.output = self.root / "public"
+        (self.content / "blog").mkdir(parents=True)
+        self.static.mkdir()
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "blog" / "post.md").write_text("# Post\n\nText")
+        (self.static / "styles.css").write_text("body {}")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def build(self, incremental: bool = True) -> BuildResult:
+        return build_site(
+            self.content,
+            self.output,
+            self.static,
+            incremental=incremental,
+        )
+
+    def test_full_build(self) -> None:
+        result = self.build(incremental=False)
+        self.assertEqual(len(result.built), 3)
+        page = (self.output / "blog" / "post.html").read_text()
+        self.assertIn("<title>Post</title>", page)
+        self.assertIn("<p>Text</p>", page)
+        self.assertEqual(
+            (self.output / "styles.css").read_text(), "body {}"
+        )
+
+    def test_parallel_build(self) -> None:
+        serial = self.build(incremental=False)
+        expected = {path: path.read_text() for path in serial.built}
+        for path in serial.built:
+            path.unlink()
+        result = build_site(
+            self.content,
+            self.output,
+            self.static,
+            jobs=2,
+        )
+        self.assertEqual(result.built, serial.built)
+        for path, html in expected.items():
+            self.assertEqual(path.read_text(), html)
+
+    def test_template(self) -> None:
+        template = self.root / "template.html"
+        template.write_text("<main>{{ content }}</main>{{title}}")
+        build_site(
+            self.content,
+            self.output,
+            template_path=template,
+            incremental=True,
+        )
+        self.assertEqual(
+            (self.output / "index.html").read_text(),
+            '<main><div><h1 id="home">Home</h1><p>Welcome</p></div>'
+            "</main>Home",
+        )
+        result = build_site(
+            self.content,
+            self.output,
+            template_path=template,
+            incremental=True,
+        )
+        self.assertEqual(result.built, [])
+        load_template.cache_clear()
+        template.write_text("<body>{{ content }}</body>")
+        result = build_site(
+            self.content,
+            self.output,
+            template_path=template,
+            incremental=True,
+        )
+        self.assertEqual(len(result.built), 2)
+
+    def test_links(self) -> None:
+        (self.content / "index.md").write_text(
+            "# Home\n\n[post](blog/post.md#post) [css](/styles.css)"
+            " [web](https://example.com) [gone](missing.md)"
+            " [bad anchor](blog/post.md#nope)"
+        )
+        result = self.build(incremental=False)
+        self.assertEqual(
+            result.dead_links,
+            [
+                ("/index.html", "/missing.html"),
+                ("/index.html", "/blog/post.html#nope"),
+            ],
+        )
+        page = (self.output / "index.html").read_text()
+        self.assertIn('<a href="/blog/post.html#post">post</a>', page)
+        self.assertIn('<a href="https://example.com">web</a>', page)
+
+    def test_parse_cache(self) -> None:
+        (self.content / "index.md").write_text(
+            "# Home\n\n[post](blog/post.md#post) [gone](missing.md)"
+        )
+        cache_dir = self.root / "cache"
+        serial = self.build(incremental=False)
+        expected = {path: path.read_text() for path in serial.built}
+        for _ in range(2):
+            profiler = Profiler()
+            result = build_site(
+                self.content,
+                self.output,
+                self.static,
+                profiler=profiler,
+                cache_dir=cache_dir,
+            )
+            self.assertEqual(result.dead_links, serial.dead_links)
+            for path, html in expected.items():
+                self.assertEqual(path.read_text(), html)
+        self.assertEqual(profiler.counters["cache_hits"], 2)
+        self.assertNotIn("cache_misses", profiler.counters)
+
+    def test_fingerprint_and_minify(self) -> None:
+        template = self.root / "template.html"
+        template.write_text(
+            '<html>\n  <link href="/styles.css">\n  {{ content }}\n</html>'
+        )
+        (self.content / "index.md").write_text(
+            "# Home\n\n![shot](/styles.css)"
+        )
+        (self.static / "robots.txt").write_text("ok")
+
+        def build() -> BuildResult:
+            return build_site(
+                self.content,
+                self.output,
+                self.static,
+                incremental=True,
+                template_path=template,
+                fingerprint=True,
+                minify=True,
+            )
+
+        result = build()
+        self.assertEqual(result.dead_links, [])
+        css = sorted(self.output.glob("styles.*.css"))
+        self.assertEqual(len(css), 1)
+        self.assertEqual(css[0].read_text(), "body{}")
+        self.assertFalse((self.output / "styles.css").exists())
+        self.assertTrue((self.output / "robots.txt").exists())
+        page = (self.output / "index.html").read_text()
+        self.assertIn(f'<link href="/{css[0].name}">', page)
+        self.assertIn(f'src="/{css[0].name}"', page)
+        self.assertNotIn("\n", page)
+        self.assertEqual(build().built, [])
+
+        (self.static / "styles.css").write_text("p { margin: 0 }")
+        result = build()
+        self.assertEqual(result.removed, css)
+        new_css = sorted(self.output.glob("styles.*.css"))
+        self.assertEqual(new_css[0].read_text(), "p{margin:0}")
+        self.assertIn(
+            new_css[0].name, (self.output / "index.html").read_text()
+        )
+        self.assertEqual(len(result.built), 3)
+
+    def test_fingerprint_rewrites_stylesheet_urls(self) -> None:
+        (self.static / "fonts").mkdir()
+        (self.static / "fonts" / "a.woff2").write_bytes(b"font")
+        (self.static / "styles.css").write_text(
+            "@font-face { src: url(fonts/a.woff2) }"
+        )
+
+        def build() -> BuildResult:
+            return build_site(
+                self.content,
+                self.output,
+                self.static,
+                incremental=True,
+                fingerprint=True,
+            )
+
+        build()
+        (font,) = (self.output / "fonts").glob("a.*.woff2")
+        (css,) = self.output.glob("styles.*.css")
+        self.assertIn(f"url(fonts/{font.name})", css.read_text())
+
+        (self.static / "fonts" / "a.woff2").write_bytes(b"new font")
+        build()
+        (new_font,) = (self.output / "fonts").glob("a.*.woff2")
+        (new_css,) = self.output.glob("styles.*.css")
+        self.assertNotEqual(new_css.name, css.name)
+        self.assertIn(
+            f"url(fonts/{new_font.name})", new_css.read_text()
+        )
+
+    def test_fingerprint_rewrites_html_assets(self) -> None:
+        about = self.static / "about.html"
+        about.write_text('<link href="/styles.css" rel="stylesheet">')
+
+        def build() -> BuildResult:
+            return build_site(
+                self.content,
+                self.output,
+                self.static,
+                incremental=True,
+                fingerprint=True,
+            )
+
+        build()
+        (css,) = self.output.glob("styles.*.css")
+        self.assertEqual(
+            (self.output / "about.html").read_text(),
+            f'<link href="/{css.name}" rel="stylesheet">',
+        )
+
+        (self.static / "styles.css").write_text("p {}")
+        result = build()
+        (new_css,) = self.output.glob("styles.*.css")
+        self.assertIn(self.output / "about.html", result.built)
+        self.assertIn(
+            f'href="/{new_css.name}"',
+            (self.output / "about.html").read_text(),
+        )
+
+    def test_listing_and_search(self) -> None:
+        def build() -> BuildResult:
+            return build_site(
+                self.content,
+                self.output,
+                self.static,
+                incremental=True,
+                listing_page_size=1,
+                search_index=True,
+            )
+
+        first = build()
+        second = build()
+        self.assertEqual(second.built, [])
+        self.assertEqual(first.generated, second.generated)
+        listing = (self.output / "list" / "1.html").read_text()
+        self.assertIn('<a href="/blog/post.html">Post</a>', listing)
+        self.assertIn('href="/list/2.html"', listing)
+        terms = json.loads(
+            (self.output / "search" / "terms-w.json").read_text()
+        )
+        self.assertEqual(terms["welcome"], [1])
+        result = self.build()
+        self.assertIn(self.output / "list" / "1.html", result.removed)
+
+    def test_incremental_skips_unchanged(self) -> None:
+        self.build()
+        result = self.build()
+        self.assertEqual(result.built, [])
+        self.assertEqual(len(result.skipped), 3)
+
+    def test_incremental_rebuilds_changed(self) -> None:
+        self.build()
+        (self.content / "index.md").write_text("# Home\n\nChanged!")
+        result = self.build()
+        self.assertEqual(result.built, [self.output / "index.html"])
+        self.assertIn(
+            "Changed!", (self.output / "index.html").read_text()
+        )
+
+    def test_incremental_rebuilds_missing_output(self) -> None:
+        self.build()
+        (self.output / "styles.css").unlink()
+        result = self.build()
+        self.assertEqual(result.built, [self.output / "styles.css"])
+
+    def test_incremental_checks_links_of_skipped_pages(self) -> None:
+        (self.content / "index.md").write_text(
+            "# Home\n\n[post](blog/post.md) [top](blog/post.md#post)"
+        )
+        self.assertEqual(self.build().dead_links, [])
+        (self.content / "blog" / "post.md").unlink()
+        result = self.build()
+        self.assertIn(self.output / "index.html", result.skipped)
+        self.assertEqual(
+            result.dead_links,
+            [
+                ("/index.html", "/blog/post.html"),
+                ("/index.html", "/blog/post.html#post"),
+            ],
+        )
+
+    def test_incremental_checks_anchors_of_skipped_pages(self) -> None:
+        (self.content / "index.md").write_text(
+            "# Home\n\n[top](blog/post.md#post)"
+        )
+        self.build()
+        (self.content / "blog" / "post.md").write_text("# Renamed\n")
+        result = self.build()
+        self.assertIn(self.output / "index.html", result.skipped)
+        self.assertEqual(
+            result.dead_links, [("/index.html", "/blog/post.html#post")]
+        )
+
+    def test_removes_stale_outputs(self) -> None:
+        self.build()
+        (self.content / "blog" / "post.md").unlink()
+        result = self.build()
+        self.assertEqual(
+            result.removed, [self.output / "blog" / "post.html"]
+        )
+        self.assertFalse((self.output / "blog" / "post.html").exists())
+
+    def test_corrupt_manifest_rebuilds(self) -> None:
+        self.build()
+        manifest_path = default_manifest_path(self.output)
+        manifest_path.write_text("{not json")
+        manifest = Manifest.load(manifest_path)
+        self.assertEqual(manifest.outputs, {})
+        result = self.build()
+        self.assertEqual(len(result.built), 3)
+
+    def test_same_output_through_another_path(self) -> None:
+        self.build()
+        result = build_site(
+            self.content,
+            self.output.resolve(),
+            self.static,
+            incremental=False,
+        )
+        self.assertEqual(result.removed, [])
+        self.assertTrue((self.output / "index.html").exists())
+
+    def test_sibling_outputs_do_not_share_a_manifest(self) -> None:
+        self.build()
+        other = self.root / "other"
+        build_site(self.content, other, self.static)
+        self.assertTrue((self.output / "index.html").exists())
+        (self.content / "blog" / "post.md").unlink()
+        result = build_site(self.content, other, self.static)
+        self.assertEqual(result.removed, [other / "blog" / "post.html"])
+        self.assertTrue((self.output / "blog" / "post.html").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from buildio import (
+    BatchWriter,
+    copy_if_changed,
+    iter_source_lines,
+    write_if_changed,
+)
+
+
+class TestBuildIO(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_iter_source_lines(self) -> None:
+        path = self.root / "page.md"
+        path.write_bytes("# Café\n\ntext".encode("utf-8"))
+        expected = ["# Café\n", "\n", "text"]
+        self.assertEqual(list(iter_source_lines(path)), expected)
+        self.assertEqual(
+            list(iter_source_lines(path, mmap_threshold=1)), expected
+        )
+
+    def test_iter_source_lines_empty(self) -> None:
+        path = self.root / "empty.md"
+        path.write_bytes(b"")
+        self.assertEqual(list(iter_source_lines(path, 0)), [])
+
+    def test_write_if_changed(self) -> None:
+        path = self.root / "page.html"
+        self.assertTrue(write_if_changed(path, b"<p>one</p>"))
+        os.utime(path, ns=(0, 0))
+        self.assertFalse(write_if_changed(path, b"<p>one</p>"))
+        self.assertEqual(path.stat().st_mtime_ns, 0)
+        self.assertTrue(write_if_changed(path, b"<p>two</p>"))
+        self.assertEqual(path.read_bytes(), b"<p>two</p>")
+
+    def test_copy_if_changed(self) -> None:
+        source = self.root / "styles.css"
+        output = self.root / "out.css"
+        source.write_text("body {}")
+        self.assertTrue(copy_if_changed(source, output))
+        self.assertFalse(copy_if_changed(source, output))
+        source.write_text("p {}   ")
+        self.assertTrue(copy_if_changed(source, output))
+        self.assertEqual(output.read_text(), "p {}   ")
+
+    def test_batch_writer(self) -> None:
+        write_if_changed(self.root / "same.html", b"same")
+        with BatchWriter(max_bytes=8) as writer:
+            for index in range(5):
+                writer.write(self.root / f"{index}.html", b"page")
+            writer.write(self.root / "same.html", b"same")
+        self.assertEqual(writer.written, 5)
+        self.assertEqual(writer.unchanged, 1)
+        self.assertEqual((self.root / "4.html").read_bytes(), b"page")
+
+    def test_batch_writer_raises(self) -> None:
+        writer = BatchWriter()
+        writer.write(self.root / "missing" / "page.html", b"page")
+        with self.assertRaises(FileNotFoundError):
+            writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from escaping import (
+    SafeString,
+    attributes_to_html,
+    escape_attribute,
+    escape_text,
+)
+
+
+class TestEscapeAttribute(unittest.TestCase):
+
+    def test_escapes_special_characters(self) -> None:
+        self.assertEqual(
+            escape_attribute("a \"b\" & <c> 'd'"),
+            "a &quot;b&quot; &amp; &lt;c&gt; &#x27;d&#x27;",
+        )
+
+    def test_converts_non_strings(self) -> None:
+        self.assertEqual(escape_attribute(3), "3")
+
+
+class TestEscapeText(unittest.TestCase):
+
+    def test_escapes_special_characters(self) -> None:
+        self.assertEqual(
+            escape_text('1 < 2 & "3" > 0'), '1 &lt; 2 &amp; "3" &gt; 0'
+        )
+
+    def test_plain_text_is_not_copied(self) -> None:
+        value = "".join(["plain ", "text"])
+        self.assertIs(escape_text(value), value)
+
+    def test_never_escapes_twice(self) -> None:
+        escaped = escape_text("a & b")
+        self.assertIsInstance(escaped, SafeString)
+        self.assertEqual(escape_text(escaped), "a &amp; b")
+
+    def test_safe_string(self) -> None:
+        markup = SafeString("<em>raw</em>")
+        self.assertIs(escape_text(markup), markup)
+
+
+class TestAttributesToHTML(unittest.TestCase):
+
+    def test_empty(self) -> None:
+        self.assertEqual(attributes_to_html(None), "")
+        self.assertEqual(attributes_to_html({}), "")
+
+    def test_serializes_in_order(self) -> None:
+        self.assertEqual(
+            attributes_to_html({"href": "/a?x=1&y=2", "id": "top"}),
+            'href="/a?x=1&amp;y=2" id="top"',
+        )
+
+    def test_reflects_mutation(self) -> None:
+        props = {"href": "/one"}
+        self.assertEqual(attributes_to_html(props), 'href="/one"')
+        props["href"] = "/two"
+        self.assertEqual(attributes_to_html(props), 'href="/two"')
+
+    def test_equal_values_of_other_types(self) -> None:
+        self.assertEqual(
+            attributes_to_html({"data-x": 1}), 'data-x="1"'
+        )
+        self.assertEqual(
+            attributes_to_html({"data-x": True}), 'data-x="True"'
+        )
+        self.assertEqual(
+            attributes_to_html({"data-x": 1.0}), 'data-x="1.0"'
+        )
+
+    def test_unhashable_values(self) -> None:
+        self.assertEqual(
+            attributes_to_html({"data-ids": [1, 2]}),
+            'data-ids="[1, 2]"',
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
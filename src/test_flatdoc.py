@@ -0,0 +1,178 @@
+import unittest
+
+from blocks import markdown_to_html_node
+from escaping import SafeString
+from flatdoc import NO_NODE, FlatDocument, markdown_to_document
+from htmlnode import LeafNode, ParentNode
+
+MARKDOWN = """# Title
+
+A paragraph with **bold** and a [link](/about.html).
+
+- one
+- two
+
+```
+x < y
+```
+"""
+
+
+def build_tree() -> ParentNode:
+    return ParentNode(
+        "div",
+        [
+            ParentNode(
+                "p",
+                [
+                    LeafNode(None, "a < b "),
+                    LeafNode("a", "link", {"href": "/x"}),
+                ],
+            ),
+            LeafNode("img", "", {"src": "/i.png", "alt": "i"}),
+            ParentNode(
+                "ul", [LeafNode("li", "one")], {"class": "list"}
+            ),
+        ],
+    )
+
+
+class TestFlatDocument(unittest.TestCase):
+
+    def test_round_trip(self) -> None:
+        tree = build_tree()
+        document = FlatDocument.from_node(tree)
+        self.assertEqual(len(document), 7)
+        self.assertEqual(document.to_node(), tree)
+
+    def test_to_html_matches_tree(self) -> None:
+        tree = build_tree()
+        self.assertEqual(
+            FlatDocument.from_node(tree).to_html(), tree.to_html()
+        )
+
+    def test_structure_arrays(self) -> None:
+        document = FlatDocument.from_node(build_tree())
+        self.assertEqual(list(document.parents), [-1, 0, 1, 1, 0, 0, 5])
+        self.assertEqual(list(document.iter_children(0)), [1, 4, 5])
+        self.assertEqual(document.next_siblings[5], NO_NODE)
+        self.assertEqual(document.value(2), "a < b ")
+        self.assertIsNone(document.value(0))
+        self.assertEqual(
+            document.tag_names,
+            ["div", "p", None, "a", "img", "ul", "li"],
+        )
+
+    def test_subtree_to_node(self) -> None:
+        document = FlatDocument.from_node(build_tree())
+        self.assertEqual(
+            document.to_node(5),
+            ParentNode(
+                "ul", [LeafNode("li", "one")], {"class": "list"}
+            ),
+        )
+
+    def test_builder(self) -> None:
+        document = FlatDocument()
+        document.open("ul")
+        document.add_leaf("li", "first")
+        document.add_leaf("li", "second")
+        document.close()
+        self.assertEqual(
+            document.to_html(), "<ul><li>first</li><li>second</li></ul>"
+        )
+        with self.assertRaises(ValueError):
+            document.add_leaf("li", "outside the root")
+
+    def test_props_of_other_types_are_not_merged(self) -> None:
+        document = FlatDocument()
+        document.open("div")
+        document.add_leaf("span", "a", {"data-x": 1})
+        document.add_leaf("span", "b", {"data-x": True})
+        document.close()
+        self.assertEqual(
+            document.to_html(),
+            '<div><span data-x="1">a</span><span data-x="True">b</span>'
+            "</div>",
+        )
+
+    def test_equality(self) -> None:
+        self.assertEqual(
+            FlatDocument.from_node(build_tree()),
+            FlatDocument.from_node(build_tree()),
+        )
+        other = build_tree()
+        assert other.children is not None
+        first = other.children[0]
+        assert first.children is not None
+        first.children[0].value = "changed"
+        self.assertNotEqual(
+            FlatDocument.from_node(build_tree()),
+            FlatDocument.from_node(other),
+        )
+
+    def test_safe_string_is_not_escaped(self) -> None:
+        tree = ParentNode(
+            "p",
+            [LeafNode(None, SafeString("<br>")), LeafNode(None, "<")],
+        )
+        document = FlatDocument.from_node(tree)
+        self.assertEqual(document.to_html(), "<p><br>&lt;</p>")
+        children = document.to_node().children
+        assert children is not None
+        self.assertIs(type(children[0].value), SafeString)
+
+    def test_serialization_round_trip(self) -> None:
+        document = markdown_to_document(MARKDOWN)
+        loaded = FlatDocument.from_bytes(document.to_bytes())
+        self.assertEqual(loaded, document)
+        self.assertEqual(loaded.to_html(), document.to_html())
+        self.assertEqual(loaded.to_node(), document.to_node())
+
+    def test_serialization_rejects_bad_data(self) -> None:
+        data = markdown_to_document(MARKDOWN).to_bytes()
+        for bad in (b"", b"not a document" * 4, data[:-1], data + b"x"):
+            with self.assertRaises(ValueError):
+                FlatDocument.from_bytes(bad)
+        version = data[:8] + b"\xff\xff" + data[10:]
+        with self.assertRaises(ValueError):
+            FlatDocument.from_bytes(version)
+
+    def test_serialization_rejects_corrupt_arrays(self) -> None:
+        corruptions = [
+            ("kinds", 1, 7),
+            ("tags", 1, 1000),
+            ("props_ids", 1, 1000),
+            ("starts", 2, 1 << 40),
+            ("parents", 0, 1),
+            ("parents", 2, 5),
+            ("first_children", 0, 3),
+            ("next_siblings", 1, 1000),
+        ]
+        for name, index, value in corruptions:
+            with self.subTest(name=name, index=index):
+                document = markdown_to_document(MARKDOWN)
+                getattr(document, name)[index] = value
+                with self.assertRaises(ValueError):
+                    FlatDocument.from_bytes(document.to_bytes())
+
+    def test_render_errors_match_tree(self) -> None:
+        document = FlatDocument()
+        document.open("div")
+        document.close()
+        with self.assertRaises(ValueError):
+            document.to_html()
+
+    def test_markdown_to_document(self) -> None:
+        tree = markdown_to_html_node(MARKDOWN)
+        document = markdown_to_document(MARKDOWN)
+        self.assertEqual(document, FlatDocument.from_node(tree))
+        self.assertEqual(document.to_html(), tree.to_html())
+        self.assertEqual(
+            markdown_to_document("").to_html(),
+            markdown_to_html_node("").to_html(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,16 @@
+import io
 import unittest
 
+from escaping import SafeString
 from textnode import TextNode, TextType
 from htmlnode import (
     HTMLNode,
     LeafNode,
     ParentNode,
+    leaf_factory,
+    register_inline_type,
     text_node_to_html_node,
+    text_nodes_to_html_nodes,
 )
 
 
@@ -51,6 +56,18 @@ class TestHTMLNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             HTMLNode("div", "This is a div", {"class": "container"}, "invalid_children")  # type: ignore
 
+    def test_no_instance_dict(self) -> None:
+        for node in (
+            HTMLNode("div", "x"),
+            LeafNode("p", "x"),
+            ParentNode("div", [LeafNode("p", "x")]),
+        ):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_tag_interned(self) -> None:
+        tag = "".join(["d", "iv"])
+        self.assertIs(HTMLNode(tag).tag, HTMLNode("div").tag)
+
     def test_props_to_html(self) -> None:
         node = HTMLNode(
             "div", "This is a div", {"class": "container"}, []
@@ -75,10 +92,30 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("p", "Hello, world!")
         self.assertEqual(node.to_html(), "<p>Hello, world!</p>")
 
+    def test_leaf_to_html_escapes_props(self) -> None:
+        node = LeafNode("a", "Search", {"href": "/q?a=1&b=2"})
+        self.assertEqual(
+            node.to_html(), '<a href="/q?a=1&amp;b=2">Search</a>'
+        )
+
+    def test_leaf_to_html_escapes_value(self) -> None:
+        node = LeafNode("code", "if a < b && c > d:")
+        self.assertEqual(
+            node.to_html(),
+            "<code>if a &lt; b &amp;&amp; c &gt; d:</code>",
+        )
+        node = LeafNode(None, SafeString("<br>"))
+        self.assertEqual(node.to_html(), "<br>")
+
     def test_leaf_children_none(self) -> None:
         node = LeafNode("p", "Hello, world!", {})
         self.assertEqual(node.children, None)
 
+    def test_leaf_trusted(self) -> None:
+        node = LeafNode.trusted("a", "link", {"href": "/"})
+        self.assertEqual(node, LeafNode("a", "link", {"href": "/"}))
+        self.assertEqual(node.to_html(), '<a href="/">link</a>')
+
 
 class TestParentNode(unittest.TestCase):
 
@@ -115,8 +152,124 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_iter_html(self) -> None:
+        parent_node = ParentNode(
+            "div", [LeafNode("b", "bold"), LeafNode(None, " text")]
+        )
+        self.assertEqual(
+            list(parent_node.iter_html()),
+            ["<div>", "<b>bold</b>", " text", "</div>"],
+        )
+
+    def test_write_html(self) -> None:
+        grandchild_node = LeafNode("b", "grandchild")
+        child_node = ParentNode("span", [grandchild_node])
+        parent_node = ParentNode("div", [child_node])
+        buffer = io.StringIO()
+        parent_node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), parent_node.to_html())
+
+    def test_to_html_without_children(self) -> None:
+        with self.assertRaises(ValueError):
+            ParentNode("div", []).to_html()
+
+    def test_to_html_deep_tree(self) -> None:
+        node: HTMLNode = LeafNode("b", "deep")
+        for _ in range(10_000):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<div>" * 10_000 + "<b>"))
+        self.assertTrue(html.endswith("</b>" + "</div>" * 10_000))
+
+    def test_eq_deep_tree(self) -> None:
+        def build(leaf: str) -> HTMLNode:
+            node: HTMLNode = LeafNode("b", leaf)
+            for _ in range(10_000):
+                node = ParentNode("div", [node])
+            return node
+
+        self.assertEqual(build("x"), build("x"))
+        self.assertNotEqual(build("x"), build("y"))
+        self.assertEqual(hash(build("x")), hash(build("x")))
+
+    def test_eq_different_shape(self) -> None:
+        child = LeafNode("b", "x")
+        self.assertNotEqual(
+            ParentNode("div", [child]),
+            ParentNode("div", [child, child]),
+        )
+        self.assertNotEqual(
+            ParentNode("div", [child, child]),
+            ParentNode("div", [child]),
+        )
+
+    def test_repr_nested(self) -> None:
+        node = ParentNode(
+            "div", [LeafNode("b", "x"), LeafNode(None, "y")]
+        )
+        self.assertEqual(
+            repr(node),
+            "HTMLNode(tag=div, value=None, props=None, children=["
+            "HTMLNode(tag=b, value=x, props=None, children=None), "
+            "HTMLNode(tag=None, value=y, props=None, children=None)])",
+        )
+
+    def test_parent_trusted(self) -> None:
+        children: list[HTMLNode] = [LeafNode("b", "x")]
+        node = ParentNode.trusted("div", children)
+        self.assertEqual(node, ParentNode("div", children))
+        self.assertEqual(node.to_html(), "<div><b>x</b></div>")
+
+    def test_hash(self) -> None:
+        def build(leaf: str) -> ParentNode:
+            return ParentNode(
+                "div",
+                [LeafNode("b", leaf, {"class": "x", "id": "y"})],
+            )
+
+        self.assertEqual(hash(build("x")), hash(build("x")))
+        self.assertNotEqual(hash(build("x")), hash(build("y")))
+        self.assertEqual(len({build("x"), build("x")}), 1)
+
+    def test_hash_ignores_props_order(self) -> None:
+        node = LeafNode("a", "x", {"href": "/", "id": "y"})
+        node2 = LeafNode("a", "x", {"id": "y", "href": "/"})
+        self.assertEqual(node, node2)
+        self.assertEqual(hash(node), hash(node2))
+
     def test_text(self) -> None:
         node = TextNode("This is a text node", TextType.TEXT)
         html_node = text_node_to_html_node(node)
         self.assertEqual(html_node.tag, None)
         self.assertEqual(html_node.value, "This is a text node")
+
+    def test_batch_conversion(self) -> None:
+        nodes = [
+            TextNode("a", TextType.TEXT),
+            TextNode("b", TextType.STRIKETHROUGH),
+            TextNode("c", TextType.LINK, "/c"),
+        ]
+        self.assertEqual(
+            text_nodes_to_html_nodes(nodes),
+            [text_node_to_html_node(node) for node in nodes],
+        )
+        html_nodes = text_nodes_to_html_nodes(nodes)
+        self.assertEqual(
+            "".join(node.to_html() for node in html_nodes),
+            'a<s>b</s><a href="/c">c</a>',
+        )
+
+    def test_register_inline_type(self) -> None:
+        try:
+            register_inline_type(
+                TextType.STRIKETHROUGH, leaf_factory("del")
+            )
+            node = TextNode("gone", TextType.STRIKETHROUGH)
+            self.assertEqual(
+                text_nodes_to_html_nodes([node])[0].to_html(),
+                "<del>gone</del>",
+            )
+        finally:
+            register_inline_type(
+                TextType.STRIKETHROUGH, leaf_factory("s")
+            )
@@ -0,0 +1,79 @@
+import tempfile
+import typing as t
+import unittest
+from pathlib import Path
+
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from lazy import LazyParentNode, lazy_page
+
+
+def counting_factory(
+    produced: list[int], count: int
+) -> t.Callable[[], t.Iterator[HTMLNode]]:
+    def factory() -> t.Iterator[HTMLNode]:
+        for i in range(count):
+            produced.append(i)
+            yield ParentNode("p", [LeafNode(None, f"block {i}")])
+
+    return factory
+
+
+class TestLazyParentNode(unittest.TestCase):
+
+    def test_children_not_produced_until_traversed(self) -> None:
+        produced: list[int] = []
+        node = LazyParentNode("div", counting_factory(produced, 3))
+        self.assertEqual(produced, [])
+        self.assertFalse(node.is_materialized)
+        self.assertEqual(
+            node.to_html(),
+            "<div><p>block 0</p><p>block 1</p><p>block 2</p></div>",
+        )
+        self.assertEqual(produced, [0, 1, 2])
+        self.assertTrue(node.is_materialized)
+
+    def test_traversal_is_repeatable(self) -> None:
+        produced: list[int] = []
+        node = LazyParentNode("div", counting_factory(produced, 2))
+        self.assertEqual(node.to_html(), node.to_html())
+        self.assertEqual(produced, [0, 1])
+
+    def test_equals_eager_node(self) -> None:
+        node = LazyParentNode("div", counting_factory([], 2))
+        eager = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "block 0")]),
+                ParentNode("p", [LeafNode(None, "block 1")]),
+            ],
+        )
+        self.assertEqual(node, eager)
+        self.assertEqual(hash(node), hash(eager))
+        self.assertEqual(len(node.children), 2)
+
+    def test_assigning_children_replaces_factory(self) -> None:
+        produced: list[int] = []
+        node = LazyParentNode("div", counting_factory(produced, 2))
+        node.children = [LeafNode("p", "eager")]
+        self.assertEqual(node.to_html(), "<div><p>eager</p></div>")
+        self.assertEqual(produced, [])
+
+    def test_empty_factory_raises_on_render(self) -> None:
+        node = LazyParentNode("div", lambda: [])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+    def test_lazy_page(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "post.md"
+            source.write_text(
+                "# Title\n\nFirst paragraph.\n", encoding="utf-8"
+            )
+            self.assertEqual(
+                lazy_page(source).to_html(),
+                "<div><h1>Title</h1><p>First paragraph.</p></div>",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from linkindex import LinkIndex, PageLinks, resolve_link, slugify
+
+
+class TestSlugify(unittest.TestCase):
+
+    def test_slugify(self) -> None:
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  A -- B  "), "a-b")
+        self.assertEqual(slugify("!!!"), "section")
+
+
+class TestResolveLink(unittest.TestCase):
+
+    def test_external(self) -> None:
+        for href in ("https://example.com", "mailto:a@b.c", "//cdn/x"):
+            self.assertIsNone(resolve_link("/index.html", href))
+
+    def test_relative(self) -> None:
+        page = "/blog/post.html"
+        self.assertEqual(
+            resolve_link(page, "other.md"), "/blog/other.html"
+        )
+        self.assertEqual(
+            resolve_link(page, "../img/a.png"), "/img/a.png"
+        )
+        self.assertEqual(resolve_link(page, "../"), "/")
+        self.assertEqual(resolve_link(page, "sub/"), "/blog/sub/")
+        self.assertEqual(resolve_link(page, "/about.md"), "/about.html")
+
+    def test_fragment_and_query(self) -> None:
+        page = "/blog/post.html"
+        self.assertEqual(
+            resolve_link(page, "#top"), "/blog/post.html#top"
+        )
+        self.assertEqual(
+            resolve_link(page, "a.md?x=1#b"), "/blog/a.html?x=1#b"
+        )
+
+
+class TestLinkIndex(unittest.TestCase):
+
+    def test_collect(self) -> None:
+        link = LeafNode("a", "next", {"href": "next.md"})
+        block = ParentNode("h2", [link], {"id": "intro"})
+        page = PageLinks("/docs/index.html")
+        page.collect(block)
+        self.assertEqual(page.anchors, ["intro"])
+        self.assertEqual(page.links, ["/docs/next.html"])
+        self.assertEqual(link.props, {"href": "/docs/next.html"})
+
+    def test_collect_keeps_fragment_links(self) -> None:
+        jump = LeafNode("a", "intro", {"href": "#intro"})
+        top = LeafNode("a", "top", {"href": "#"})
+        block = ParentNode("p", [jump, top])
+        page = PageLinks("/docs/index.html")
+        page.collect(block)
+        self.assertEqual(
+            page.links, ["/docs/index.html#intro", "/docs/index.html"]
+        )
+        self.assertEqual(jump.props, {"href": "#intro"})
+        self.assertEqual(top.props, {"href": "#"})
+
+    def test_dead_links(self) -> None:
+        index = LinkIndex()
+        index.add_target("/styles.css")
+        index.add_target("/docs/index.html")
+        first = PageLinks("/index.html")
+        first.anchors = ["top"]
+        first.links = [
+            "/styles.css",
+            "/docs/",
+            "/docs",
+            "/index.html#top",
+            "/index.html#missing",
+            "/nowhere.html",
+        ]
+        index.add_page(first)
+        self.assertEqual(
+            index.dead_links(),
+            [
+                ("/index.html", "/index.html#missing"),
+                ("/index.html", "/nowhere.html"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from flatdoc import markdown_to_document
+from htmlnode import LeafNode, ParentNode
+from listing import (
+    ListingWriter,
+    PageRecord,
+    SearchIndexWriter,
+    shard_name,
+)
+from template import Template
+
+
+def make_record(index: int) -> PageRecord:
+    record = PageRecord(f"/post{index}.html")
+    record.add_block("h1", f"Post {index}")
+    record.add_block("p", f"Body of post {index}, shared words.")
+    return record
+
+
+class TestPageRecord(unittest.TestCase):
+
+    def test_collect(self) -> None:
+        record = PageRecord("/a.html")
+        record.collect(
+            ParentNode(
+                "h1", [LeafNode(None, "The "), LeafNode("b", "Title")]
+            )
+        )
+        record.collect(ParentNode("h2", [LeafNode(None, "Part")]))
+        record.collect(
+            ParentNode("p", [LeafNode(None, "Some Text, a")])
+        )
+        self.assertEqual(record.title, "The Title")
+        self.assertEqual(record.headings, ["Part"])
+        self.assertEqual(record.excerpt, "Some Text, a")
+        self.assertEqual(
+            record.terms, {"the", "title", "part", "some", "text"}
+        )
+
+    def test_collect_document_matches_collect(self) -> None:
+        markdown = "# Title\n\n## Part\n\nSome **bold** text\n"
+        document = markdown_to_document(markdown)
+        from_document = PageRecord("/a.html")
+        from_document.collect_document(document)
+        from_nodes = PageRecord("/a.html")
+        for block in document.to_node().children or ():
+            from_nodes.collect(block)
+        for name in PageRecord.__slots__:
+            self.assertEqual(
+                getattr(from_document, name), getattr(from_nodes, name)
+            )
+
+    def test_excerpt_is_truncated(self) -> None:
+        record = PageRecord("/a.html")
+        record.add_block("p", "word " * 100)
+        self.assertLessEqual(len(record.excerpt), 201)
+        self.assertTrue(record.excerpt.endswith("…"))
+        excerpt = record.excerpt
+        record.add_block("p", "more")
+        self.assertEqual(record.excerpt, excerpt)
+        self.assertFalse(record.listed)
+        record.add_block("h1", "Title")
+        self.assertTrue(record.listed)
+
+
+class TestListingWriter(unittest.TestCase):
+
+    def test_pagination(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp) / "list"
+            writer = ListingWriter(
+                directory,
+                "/list",
+                Template.compile(
+                    "<title>{{ title }}</title>{{ content }}"
+                ),
+                page_size=2,
+            )
+            for index in range(5):
+                writer.add(make_record(index))
+            written = writer.close()
+            self.assertEqual(
+                [path.name for path in written],
+                ["1.html", "2.html", "3.html"],
+            )
+            second = (directory / "2.html").read_text()
+            self.assertIn("<title>All pages, page 2</title>", second)
+            self.assertIn('<a href="/post2.html">Post 2</a>', second)
+            self.assertIn('href="/list/1.html"', second)
+            self.assertIn('href="/list/3.html"', second)
+            last = (directory / "3.html").read_text()
+            self.assertNotIn('rel="next"', last)
+            self.assertIn("<li>", last)
+
+    def test_empty_listing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            template = Template.compile("{{ title }}{{ content }}")
+            writer = ListingWriter(Path(tmp), "/list", template)
+            self.assertEqual(len(writer.close()), 1)
+
+
+class TestSearchIndexWriter(unittest.TestCase):
+
+    def test_sharded_index(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            writer = SearchIndexWriter(
+                directory, docs_per_chunk=2, max_postings=3
+            )
+            for index in range(5):
+                writer.add(make_record(index))
+            writer.close()
+            meta = json.loads((directory / "meta.json").read_text())
+            self.assertEqual(meta["documents"], 5)
+            self.assertEqual(meta["docs_per_chunk"], 2)
+            self.assertIn("s", meta["shards"])
+            terms = json.loads((directory / "terms-s.json").read_text())
+            self.assertEqual(terms["shared"], [0, 1, 2, 3, 4])
+            docs = json.loads((directory / "docs-2.json").read_text())
+            self.assertEqual(docs[0][:2], ["/post4.html", "Post 4"])
+            self.assertFalse((directory / "docs-3.json").exists())
+
+    def test_large_shards_are_split(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            writer = SearchIndexWriter(
+                directory, max_postings=5, max_shard_postings=4
+            )
+            words = ["sa", "sab", "sabc", "sb", "sc", "sd", "x1"]
+            for index in range(3):
+                record = PageRecord(f"/p{index}.html")
+                record.terms.update(words)
+                writer.add(record)
+            writer.close()
+            meta = json.loads((directory / "meta.json").read_text())
+            self.assertEqual(
+                meta["shards"],
+                ["sa", "sab", "sabc", "sb", "sc", "sd", "x"],
+            )
+            for word in words:
+                key = shard_name(word, len(word))
+                matches = [
+                    name
+                    for name in meta["shards"]
+                    if key.startswith(name)
+                ]
+                shard = max(matches, key=len)
+                terms = json.loads(
+                    (directory / f"terms-{shard}.json").read_text()
+                )
+                self.assertEqual(terms[word], [0, 1, 2])
+
+    def test_shard_name(self) -> None:
+        self.assertEqual(shard_name("python"), "p")
+        self.assertEqual(shard_name("éte"), "_")
+        self.assertEqual(shard_name("python", 2), "py")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import contextlib
+import io
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from main import main, parse_args
+
+
+class TestParseArgs(unittest.TestCase):
+
+    def test_defaults_to_build(self) -> None:
+        self.assertEqual(parse_args([]).command, "build")
+        args = parse_args(["--incremental", "-j", "4"])
+        self.assertEqual(args.command, "build")
+        self.assertTrue(args.incremental)
+        self.assertEqual(args.jobs, 4)
+
+    def test_listing_must_be_positive(self) -> None:
+        self.assertEqual(parse_args(["--listing", "5"]).listing, 5)
+        for value in ("0", "-1", "x"):
+            with contextlib.redirect_stderr(io.StringIO()):
+                with self.assertRaises(SystemExit):
+                    parse_args(["--listing", value])
+
+    def test_subcommands(self) -> None:
+        self.assertEqual(
+            parse_args(["serve", "--port", "9000"]).port, 9000
+        )
+        args = parse_args(["page", "content/a.md", "content/b.md"])
+        self.assertEqual(
+            args.sources, [Path("content/a.md"), Path("content/b.md")]
+        )
+
+
+class TestMain(unittest.TestCase):
+
+    def test_import_is_cheap(self) -> None:
+        heavy = ("asyncio", "build", "concurrent.futures", "server")
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, main; "
+                f"print([m for m in {heavy!r} if m in sys.modules])",
+            ],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(completed.stdout.strip(), "[]")
+
+    def test_page(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            content = root / "content"
+            (content / "docs").mkdir(parents=True)
+            source = content / "docs" / "guide.md"
+            source.write_text("# Guide\n\nSee [home](../index.md).\n")
+            output = root / "public"
+            with contextlib.redirect_stdout(io.StringIO()):
+                main(
+                    [
+                        "page",
+                        "--content",
+                        str(content),
+                        "--output",
+                        str(output),
+                        "--template",
+                        str(root / "missing.html"),
+                        str(source),
+                    ]
+                )
+            page = (output / "docs" / "guide.html").read_text()
+            self.assertIn("<title>Guide</title>", page)
+            self.assertIn('href="/index.html"', page)
+            self.assertEqual(
+                [path.name for path in output.rglob("*.html")],
+                ["guide.html"],
+            )
+
+    def test_page_after_fingerprinted_build(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            content = root / "content"
+            static = root / "static"
+            content.mkdir()
+            static.mkdir()
+            (static / "styles.css").write_text("body {}")
+            source = content / "index.md"
+            source.write_text("# Home\n\n[css](/styles.css)\n")
+            output = root / "public"
+            options = [
+                "--content",
+                str(content),
+                "--output",
+                str(output),
+            ]
+            flags = [
+                "--static",
+                str(static),
+                "--fingerprint",
+                "--minify",
+            ]
+            with contextlib.redirect_stdout(io.StringIO()):
+                main(["build", *options, *flags])
+                source.write_text("# Home\n\n[styles](/styles.css)\n")
+                main(["page", *options, str(source)])
+            (css,) = output.glob("styles.*.css")
+            page = (output / "index.html").read_text()
+            self.assertIn(f'href="/{css.name}"', page)
+            self.assertIn("styles", page)
+            self.assertNotIn("\n", page)
+
+    def test_page_outside_content(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "page.md"
+            source.write_text("# Page\n")
+            content = Path(tmp) / "content"
+            with self.assertRaises(SystemExit):
+                main(["page", "--content", str(content), str(source)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import tempfile
+import typing as t
+import unittest
+from pathlib import Path
+
+from build import build_site
+from profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_stage_and_count(self) -> None:
+        profiler = Profiler()
+        with profiler.stage("parse", "a.md"):
+            pass
+        profiler.count("nodes", 3, "a.md")
+        profiler.count("nodes", 2)
+        report = profiler.report()
+        self.assertIn("parse", report["stages"])
+        self.assertEqual(report["counters"], {"nodes": 5})
+        self.assertEqual(
+            report["pages"]["a.md"]["counters"], {"nodes": 3}
+        )
+
+    def test_hooks(self) -> None:
+        events: list[tuple[str, str, t.Optional[str]]] = []
+        profiler = Profiler()
+        profiler.add_hook(
+            lambda event, stage, page: events.append(
+                (event, stage, page)
+            )
+        )
+        with profiler.stage("render", "a.md"):
+            pass
+        self.assertEqual(
+            events,
+            [("start", "render", "a.md"), ("end", "render", "a.md")],
+        )
+
+    def test_timed_iter(self) -> None:
+        profiler = Profiler()
+        self.assertEqual(
+            list(profiler.timed_iter("parse", [1, 2, 3])), [1, 2, 3]
+        )
+        self.assertIn("parse", profiler.stages)
+
+    def test_merge(self) -> None:
+        worker = Profiler()
+        worker.add_time("render", 1.0, "a.md")
+        worker.count("nodes", 4, "a.md")
+        profiler = Profiler()
+        profiler.add_time("render", 0.5)
+        profiler.merge(worker.report())
+        self.assertEqual(profiler.stages["render"], 1.5)
+        self.assertEqual(profiler.pages["a.md"]["counters"]["nodes"], 4)
+
+
+class TestBuildProfile(unittest.TestCase):
+
+    def test_build_profile(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            content = Path(tmp) / "content"
+            content.mkdir()
+            (content / "index.md").write_text("# Home\n\n**Hi**")
+            (content / "about.md").write_text("# About")
+            for jobs in (1, 2):
+                profiler = Profiler()
+                build_site(
+                    content,
+                    Path(tmp) / "public",
+                    jobs=jobs,
+                    profiler=profiler,
+                )
+                report = profiler.report()
+                page = report["pages"][str(content / "index.md")]
+                self.assertEqual(page["counters"]["nodes"], 4)
+                for stage in ("scan", "parse", "render", "template"):
+                    self.assertIn(stage, report["stages"])
+                self.assertEqual(report["counters"]["outputs_built"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
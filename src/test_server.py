@@ -0,0 +1,154 @@
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from server import DevServer
+
+
+async def fetch(server: DevServer, request: bytes) -> bytes:
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    async with listener:
+        reader, writer = await asyncio.open_connection(
+            "127.0.0.1", port
+        )
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+
+class TestDevServer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.content = root / "content"
+        self.static = root / "static"
+        (self.content / "blog").mkdir(parents=True)
+        self.static.mkdir()
+        (self.content / "index.md").write_text("# Home")
+        (self.content / "blog" / "post.md").write_text("# Post")
+        (self.static / "styles.css").write_text("body {}")
+        self.template = root / "template.html"
+        self.template.write_text("<body>{{ content }}</body>")
+        self.server = DevServer(
+            self.content, self.static, self.template
+        )
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def touch(self, path: Path, text: str) -> None:
+        path.write_text(text)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_renders_site_in_memory(self) -> None:
+        self.assertEqual(
+            sorted(self.server.files),
+            ["/blog/post.html", "/index.html", "/styles.css"],
+        )
+        self.assertEqual(
+            self.server.files["/index.html"],
+            b'<body><div><h1 id="home">Home</h1></div></body>',
+        )
+
+    def test_lookup(self) -> None:
+        for path in ("/", "/index.html", "/index"):
+            found = self.server.lookup(path)
+            assert found is not None
+            self.assertEqual(found[0], "/index.html")
+        self.assertIsNone(self.server.lookup("/missing"))
+
+    def test_rerenders_only_changed_page(self) -> None:
+        self.assertEqual(self.server.check_changes(), [])
+        self.touch(self.content / "blog" / "post.md", "# Edited")
+        self.assertEqual(
+            self.server.check_changes(), ["/blog/post.html"]
+        )
+        self.assertIn(b"Edited", self.server.files["/blog/post.html"])
+
+    def test_template_change_rerenders_pages(self) -> None:
+        self.touch(self.template, "<main>{{ content }}</main>")
+        self.assertEqual(
+            self.server.check_changes(),
+            ["/blog/post.html", "/index.html"],
+        )
+
+    def test_added_and_removed_files(self) -> None:
+        (self.content / "blog" / "post.md").unlink()
+        (self.content / "about.md").write_text("# About")
+        self.assertEqual(
+            self.server.check_changes(),
+            ["/about.html", "/blog/post.html"],
+        )
+        self.assertNotIn("/blog/post.html", self.server.files)
+
+    def test_render_errors_serve_an_error_page(self) -> None:
+        (self.content / "bad.md").write_bytes(b"# Bad \xff\n")
+        with contextlib.redirect_stderr(io.StringIO()) as log:
+            self.assertEqual(self.server.check_changes(), ["/bad.html"])
+        self.assertIn("UnicodeDecodeError", log.getvalue())
+        self.assertIn(b"Build error", self.server.files["/bad.html"])
+        response = asyncio.run(
+            fetch(self.server, b"GET /bad.html HTTP/1.1\r\n\r\n")
+        )
+        self.assertTrue(response.startswith(b"HTTP/1.1 500 "))
+        self.touch(self.content / "bad.md", "# Fixed")
+        self.assertEqual(self.server.check_changes(), ["/bad.html"])
+        self.assertNotIn("/bad.html", self.server.errors)
+        self.assertIn(b"Fixed", self.server.files["/bad.html"])
+
+    def test_layout_errors_serve_error_pages(self) -> None:
+        self.touch(self.template, "<body>{{ unknown }}</body>")
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.server.check_changes()
+        self.assertEqual(
+            self.server.errors, {"/index.html", "/blog/post.html"}
+        )
+        self.assertIn(b"Build error", self.server.files["/index.html"])
+        self.assertEqual(self.server.files["/styles.css"], b"body {}")
+
+    def test_watch_survives_errors(self) -> None:
+        async def run() -> None:
+            self.server.poll_interval = 0.01
+            task = asyncio.create_task(self.server.watch())
+            (self.content / "bad.md").write_bytes(b"\xff")
+            await asyncio.sleep(0.1)
+            self.touch(self.content / "index.md", "# Still watched")
+            await asyncio.sleep(0.1)
+            self.assertFalse(task.done())
+            task.cancel()
+
+        with (
+            contextlib.redirect_stdout(io.StringIO()),
+            contextlib.redirect_stderr(io.StringIO()),
+        ):
+            asyncio.run(run())
+        self.assertIn(
+            b"Still watched", self.server.files["/index.html"]
+        )
+
+    def test_http(self) -> None:
+        response = asyncio.run(
+            fetch(self.server, b"GET /styles.css HTTP/1.1\r\n\r\n")
+        )
+        self.assertTrue(response.startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertIn(b"Content-Type: text/css\r\n", response)
+        self.assertTrue(response.endswith(b"\r\n\r\nbody {}"))
+
+    def test_http_not_found(self) -> None:
+        response = asyncio.run(
+            fetch(self.server, b"GET /nope HTTP/1.1\r\n\r\n")
+        )
+        self.assertTrue(response.startswith(b"HTTP/1.1 404 Not Found"))
+
+
+if __name__ == "__main__":
+    unittest.main()
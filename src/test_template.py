@@ -0,0 +1,51 @@
+import io
+import unittest
+
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+
+    def test_compile(self) -> None:
+        template = Template.compile(
+            "<title>{{ title }}</title><body>{{content}}</body>"
+        )
+        self.assertEqual(
+            template.chunks, ["<title>", "</title><body>", "</body>"]
+        )
+        self.assertEqual(template.slots, ["title", "content"])
+
+    def test_transform(self) -> None:
+        template = Template.compile("<p>\n{{ title }}</p>")
+        self.assertEqual(template.source, "<p>\n{{ title }}</p>")
+        upper = template.transform(str.upper)
+        self.assertEqual(upper.render(TITLE="x"), "<P>\nx</P>")
+
+    def test_render(self) -> None:
+        template = Template.compile("<h1>{{ title }}</h1>{{ title }}")
+        self.assertEqual(
+            template.render(title="Hi", unused="x"), "<h1>Hi</h1>Hi"
+        )
+
+    def test_render_without_slots(self) -> None:
+        template = Template.compile("<p>static</p>")
+        self.assertEqual(template.render(), "<p>static</p>")
+
+    def test_missing_slot(self) -> None:
+        template = Template.compile("{{ title }}{{ content }}")
+        with self.assertRaises(ValueError):
+            template.render(title="Hi")
+
+    def test_write(self) -> None:
+        template = Template.compile("<body>{{ content }}</body>")
+        buffer = io.StringIO()
+        template.write(buffer, content="<p>x</p>")
+        self.assertEqual(buffer.getvalue(), "<body><p>x</p></body>")
+
+    def test_invalid_parts(self) -> None:
+        with self.assertRaises(ValueError):
+            Template(["a", "b"], ["x", "y"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -49,6 +49,31 @@ class TestTextNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             TextNode("This is a text node", TextType.LINK, 12345)
 
+    def test_no_instance_dict(self) -> None:
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = "value"  # type: ignore[attr-defined]
+
+    def test_trusted(self) -> None:
+        node = TextNode.trusted(
+            "This is a text node", TextType.LINK, "http://example.com"
+        )
+        self.assertEqual(
+            node,
+            TextNode(
+                "This is a text node",
+                TextType.LINK,
+                "http://example.com",
+            ),
+        )
+
+    def test_hash(self) -> None:
+        node = TextNode("This is a text node", TextType.BOLD)
+        node2 = TextNode("This is a text node", TextType.BOLD)
+        self.assertEqual(hash(node), hash(node2))
+        self.assertEqual(len({node, node2}), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,10 @@
 import unittest
-from utils import buildNewNodes, split_nodes_delimiter
+from utils import (
+    buildNewNodes,
+    register_delimiter,
+    split_nodes_delimiter,
+    text_to_textnodes,
+)
 from textnode import TextNode, TextType
 
 
@@ -76,3 +81,78 @@ class Test_test_buildNewNodes(unittest.TestCase):
             TextNode("No delimiters here", TextType.TEXT)
         ]
         self.assertEqual(result, expected_result)
+
+
+class Test_test_text_to_textnodes(unittest.TestCase):
+    def test_all_inline_types(self) -> None:
+        text = (
+            "This is **text** with an _italic_ word and a `code block`"
+            " and an ![image](https://i.imgur.com/zjjcJKZ.png)"
+            " and a [link](https://boot.dev)"
+        )
+        expected_result = [
+            TextNode("This is ", TextType.TEXT),
+            TextNode("text", TextType.BOLD),
+            TextNode(" with an ", TextType.TEXT),
+            TextNode("italic", TextType.ITALIC),
+            TextNode(" word and a ", TextType.TEXT),
+            TextNode("code block", TextType.CODE),
+            TextNode(" and an ", TextType.TEXT),
+            TextNode(
+                "image",
+                TextType.IMAGE,
+                "https://i.imgur.com/zjjcJKZ.png",
+            ),
+            TextNode(" and a ", TextType.TEXT),
+            TextNode("link", TextType.LINK, "https://boot.dev"),
+        ]
+        self.assertEqual(text_to_textnodes(text), expected_result)
+
+    def test_plain_text(self) -> None:
+        self.assertEqual(
+            text_to_textnodes("No delimiters here"),
+            [TextNode("No delimiters here", TextType.TEXT)],
+        )
+        self.assertEqual(text_to_textnodes(""), [])
+
+    def test_unmatched_delimiters_are_text(self) -> None:
+        self.assertEqual(
+            text_to_textnodes("a **b and `c"),
+            [TextNode("a **b and `c", TextType.TEXT)],
+        )
+
+    def test_intraword_underscore(self) -> None:
+        self.assertEqual(
+            text_to_textnodes("call snake_case_name now"),
+            [TextNode("call snake_case_name now", TextType.TEXT)],
+        )
+
+    def test_delimiters_inside_code(self) -> None:
+        self.assertEqual(
+            text_to_textnodes("`a **b** c`"),
+            [TextNode("a **b** c", TextType.CODE)],
+        )
+
+    def test_strikethrough(self) -> None:
+        self.assertEqual(
+            text_to_textnodes("a ~~gone~~ b"),
+            [
+                TextNode("a ", TextType.TEXT),
+                TextNode("gone", TextType.STRIKETHROUGH),
+                TextNode(" b", TextType.TEXT),
+            ],
+        )
+
+    def test_register_delimiter_replaces_in_place(self) -> None:
+        try:
+            register_delimiter("~~", TextType.CODE)
+            self.assertEqual(
+                text_to_textnodes("~~x~~"),
+                [TextNode("x", TextType.CODE)],
+            )
+        finally:
+            register_delimiter("~~", TextType.STRIKETHROUGH)
+        self.assertEqual(
+            text_to_textnodes("~~x~~"),
+            [TextNode("x", TextType.STRIKETHROUGH)],
+        )
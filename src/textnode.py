@@ -6,12 +6,15 @@ class TextType(Enum):
     BOLD = "bold"
     ITALIC = "italic"
     CODE = "code"
+    STRIKETHROUGH = "strikethrough"
     IMAGE = "image"
     LINK = "link"
     TEXT = "text"
 
 
 class TextNode:
+    __slots__ = ("text", "textType", "url")
+
     def __init__(
         self, text: str, textType: TextType, url: t.Optional[str] = None
     ) -> None:
@@ -31,6 +34,22 @@ class TextNode:
         if textType == TextType.LINK and url is None:
             raise ValueError("url must be provided for LINK text type")
 
+    @classmethod
+    def trusted(
+        cls, text: str, textType: TextType, url: t.Optional[str] = None
+    ) -> "TextNode":
+        """
+        Builds a TextNode without validating its arguments.
+
+        Meant for the parser and other internal code paths that only
+        produce well-formed nodes; user code should call TextNode().
+        """
+        node = cls.__new__(cls)
+        node.text = text
+        node.textType = textType
+        node.url = url
+        return node
+
     def __eq__(self, node: object) -> bool:
         if not isinstance(node, TextNode):
             return False
@@ -40,5 +59,8 @@ class TextNode:
             and self.url == node.url
         )
 
+    def __hash__(self) -> int:
+        return hash((self.text, self.textType, self.url))
+
     def __repr__(self) -> str:
         return f"TextNode({self.text}, {self.textType}, {self.url})"
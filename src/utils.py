@@ -1,3 +1,6 @@
+import re
+import typing as t
+
 from textnode import TextNode, TextType
 
 
@@ -31,43 +34,141 @@ def buildNewNodes(
     """
     Helper function to build new nodes based on the delimiter.
     """
+    text_type = DELIMITER_TYPES.get(delimiter)
+    if text_type is None:
+        raise Exception(f"Delimiter '{delimiter}' not supported")
     new_nodes = []
     flag = False
-    match (delimiter):
-        case "`":
-            for node in old_nodes:
-                nodeTexts = node.text.split(delimiter)
-                for text in nodeTexts:
-                    if flag:
-                        new_nodes.append(TextNode(text, TextType.CODE))
-                    else:
-                        new_nodes.append(TextNode(text, TextType.TEXT))
-                    flag = not flag
-            return new_nodes
-        case "*" | "**":
-            for node in old_nodes:
-                nodeTexts = node.text.split(delimiter)
-                for text in nodeTexts:
-                    if flag:
-                        new_nodes.append(TextNode(text, TextType.BOLD))
-                    else:
-                        new_nodes.append(TextNode(text, TextType.TEXT))
-                    flag = not flag
-            return new_nodes
-        case "_":
-            for node in old_nodes:
-                nodeTexts = node.text.split(delimiter)
-                for text in nodeTexts:
-                    if flag:
-                        new_nodes.append(
-                            TextNode(text, TextType.ITALIC)
-                        )
-                    else:
-                        new_nodes.append(TextNode(text, TextType.TEXT))
-                    flag = not flag
-            return new_nodes
-        case _:
-            raise Exception(f"Delimiter '{delimiter}' not supported")
+    for node in old_nodes:
+        for text in node.text.split(delimiter):
+            new_nodes.append(
+                TextNode(text, text_type if flag else TextType.TEXT)
+            )
+            flag = not flag
+    return new_nodes
+
+
+# "*" is accepted by split_nodes_delimiter as an alias for "**".
+DELIMITER_TYPES: dict[str, TextType] = {"*": TextType.BOLD}
+_DELIMITER_SPANS: list[tuple[str, str, bool, TextType]] = []
+_tokenizer: t.Optional[tuple[re.Pattern[str], dict[str, TextType]]] = (
+    None
+)
+
+
+def register_delimiter(
+    delimiter: str,
+    text_type: TextType,
+    body: str = ".+?",
+    word_boundary: bool = False,
+) -> None:
+    """
+    Registers an inline span enclosed in a delimiter, such as **bold**.
+
+    Spans are recognised by text_to_textnodes in the same single scan
+    as every other inline element; delimiters registered earlier take
+    precedence where spans overlap, and registering a delimiter again
+    replaces it in place. The type also needs a factory registered with
+    htmlnode.register_inline_type.
+
+    :param delimiter: The string opening and closing the span.
+    :param text_type: The type of the TextNodes built from the span.
+    :param body: A regular expression, without named groups, matching
+        the enclosed text.
+    :param word_boundary: Whether the span must not touch word
+        characters on either side, as for _italic_.
+    """
+    global _tokenizer
+    DELIMITER_TYPES[delimiter] = text_type
+    span = (delimiter, body, word_boundary, text_type)
+    for index, registered in enumerate(_DELIMITER_SPANS):
+        if registered[0] == delimiter:
+            _DELIMITER_SPANS[index] = span
+            break
+    else:
+        _DELIMITER_SPANS.append(span)
+    _tokenizer = None
+
+
+def registered_delimiters() -> list[tuple[str, str, bool, TextType]]:
+    """
+    Returns the registered delimiter spans in order of precedence, each
+    as (delimiter, body, word_boundary, text_type).
+    """
+    return list(_DELIMITER_SPANS)
+
+
+def _get_tokenizer() -> tuple[re.Pattern[str], dict[str, TextType]]:
+    """
+    Returns the inline pattern combining images, links and every
+    registered delimiter, and the TextType of each delimiter group.
+    The pattern is compiled again only after a registration.
+    """
+    global _tokenizer
+    if _tokenizer is None:
+        parts = [
+            r"!\[(?P<alt>[^\[\]]*)\]\((?P<src>[^()\s]*)\)",
+            r"\[(?P<label>[^\[\]]*)\]\((?P<href>[^()\s]*)\)",
+        ]
+        group_types = {}
+        for index, span in enumerate(_DELIMITER_SPANS):
+            delimiter, body, word_boundary, text_type = span
+            name = f"span{index}"
+            escaped = re.escape(delimiter)
+            pattern = f"{escaped}(?P<{name}>{body}){escaped}"
+            if word_boundary:
+                pattern = rf"(?<!\w){pattern}(?!\w)"
+            parts.append(pattern)
+            group_types[name] = text_type
+        _tokenizer = re.compile("|".join(parts), re.DOTALL), group_types
+    return _tokenizer
+
+
+register_delimiter("`", TextType.CODE, body="[^`]+")
+register_delimiter("**", TextType.BOLD)
+register_delimiter(
+    "_", TextType.ITALIC, body="[^_]+?", word_boundary=True
+)
+register_delimiter("~~", TextType.STRIKETHROUGH)
+
+
+def text_to_textnodes(text: str) -> list[TextNode]:
+    """
+    Tokenizes inline Markdown into TextNodes in a single scan.
+
+    Links, images and the spans of every registered delimiter (code,
+    bold, italic, strikethrough and any extension) are recognised in one
+    left-to-right pass over the source, so no intermediate node lists
+    are built per delimiter. Unmatched delimiters are kept as text.
+
+    :param text: The inline Markdown source.
+    :return: The list of TextNodes, in document order.
+    """
+    pattern, group_types = _get_tokenizer()
+    make = TextNode.trusted
+    nodes = []
+    position = 0
+    for match in pattern.finditer(text):
+        start = match.start()
+        if start > position:
+            nodes.append(make(text[position:start], TextType.TEXT))
+        kind = match.lastgroup
+        if kind == "src":
+            nodes.append(
+                make(match["alt"], TextType.IMAGE, match["src"])
+            )
+        elif kind == "href":
+            nodes.append(
+                make(match["label"], TextType.LINK, match["href"])
+            )
+        else:
+            # Every alternative of the tokenizer is a named group.
+            assert kind is not None
+            nodes.append(make(match[kind], group_types[kind]))
+        position = match.end()
+    if position < len(text):
+        nodes.append(make(text[position:], TextType.TEXT))
+    return nodes
 
 
 # node = TextNode("This is text with a `code block` word", TextType.TEXT)